@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SkillBridge.settings')
 
 application = get_asgi_application()
+
+# gunicorn/uvicorn 은 시스템 체크를 실행하지 않으므로, ai.E001 같은 설정 오류는 여기서 기동을 멈춘다.
+from ai.checks import validate_ai_configuration  # noqa: E402
+
+validate_ai_configuration()
@@ -202,4 +202,23 @@ else:
     }
 
 AI_CHAT_CACHE_TTL = config("AI_CHAT_CACHE_TTL", default=300, cast=int)
+AI_CHAT_CACHE_STALE_TTL = config("AI_CHAT_CACHE_STALE_TTL", default=600, cast=int)
+AI_CHAT_NEGATIVE_CACHE_TTL = config("AI_CHAT_NEGATIVE_CACHE_TTL", default=30, cast=int)
+AI_CHAT_SEMANTIC_CACHE_SIZE = config("AI_CHAT_SEMANTIC_CACHE_SIZE", default=1000, cast=int)
+AI_CHAT_SEMANTIC_CACHE_THRESHOLD = config("AI_CHAT_SEMANTIC_CACHE_THRESHOLD", default=0.95, cast=float)
+AI_CHAT_SEMANTIC_CACHE_MAX_HISTORY = config("AI_CHAT_SEMANTIC_CACHE_MAX_HISTORY", default=2, cast=int)
 AI_JOB_ANALYSIS_CACHE_TTL = config("AI_JOB_ANALYSIS_CACHE_TTL", default=900, cast=int)
+AI_JOB_ANALYSIS_CACHE_STALE_TTL = config("AI_JOB_ANALYSIS_CACHE_STALE_TTL", default=1800, cast=int)
+AI_JOB_ANALYSIS_NEGATIVE_CACHE_TTL = config("AI_JOB_ANALYSIS_NEGATIVE_CACHE_TTL", default=60, cast=int)
+AI_RAG_EMBEDDING_CACHE_TTL = config("AI_RAG_EMBEDDING_CACHE_TTL", default=86400, cast=int)
+AI_CERTIFICATE_CORPUS_TTL = config("AI_CERTIFICATE_CORPUS_TTL", default=600, cast=int)
+AI_SINGLE_FLIGHT_TIMEOUT = config("AI_SINGLE_FLIGHT_TIMEOUT", default=60.0, cast=float)
+AI_LEGACY_RECOMMENDER_ENABLED = config("AI_LEGACY_RECOMMENDER_ENABLED", default=False, cast=bool)
+AI_HTTP_MAX_CONNECTIONS = config("AI_HTTP_MAX_CONNECTIONS", default=100, cast=int)
+AI_HTTP_MAX_KEEPALIVE_CONNECTIONS = config("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", default=20, cast=int)
+AI_HTTP_KEEPALIVE_EXPIRY = config("AI_HTTP_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+# 프로세스별 상한: 웹 워커 수 × AI_OCR_WORKERS 개의 tesseract 가 동시에 돌 수 있다.
+AI_OCR_WORKERS = config("AI_OCR_WORKERS", default=2, cast=int)
+AI_OCR_MAX_PENDING = config("AI_OCR_MAX_PENDING", default=0, cast=int)
+AI_OCR_TIMEOUT = config("AI_OCR_TIMEOUT", default=30.0, cast=float)
+AI_OCR_CACHE_TTL = config("AI_OCR_CACHE_TTL", default=604800, cast=int)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class AiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai"
+
+    def ready(self):
+        from .checks import check_ai_configuration
+        from .corpus import connect_signals
+
+        checks.register(check_ai_configuration)
+        connect_signals()
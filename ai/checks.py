@@ -0,0 +1,39 @@
+from decouple import config
+from django.conf import settings
+from django.core.checks import Error, Warning
+from django.core.exceptions import ImproperlyConfigured
+
+
+def check_ai_configuration(app_configs, **kwargs):
+    """Validate AI settings once at startup instead of on every request."""
+    if getattr(settings, "AI_LEGACY_RECOMMENDER_ENABLED", False):
+        from .services import JobRecommendationLLMClient
+
+        try:
+            JobRecommendationLLMClient()
+        except ImproperlyConfigured as exc:
+            return [
+                Error(
+                    str(exc),
+                    hint="AI_LEGACY_RECOMMENDER_ENABLED 를 끄거나 GPT_KEY 를 설정하세요.",
+                    id="ai.E001",
+                )
+            ]
+        return []
+
+    if not config("GPT_KEY", default=None):
+        return [
+            Warning(
+                "GPT_KEY 환경 변수가 설정되지 않았습니다.",
+                hint="AI 상담은 오류 안내로 응답하고, 자격증 추천은 규칙 기반 키워드 분석만 사용합니다.",
+                id="ai.W001",
+            )
+        ]
+    return []
+
+
+def validate_ai_configuration() -> None:
+    """Fail fast on AI configuration errors; WSGI/ASGI servers do not run system checks."""
+    errors = [message for message in check_ai_configuration(None) if message.is_serious()]
+    if errors:
+        raise ImproperlyConfigured(" ".join(f"{message.msg} ({message.id})" for message in errors))
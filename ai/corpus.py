@@ -0,0 +1,186 @@
+"""Process-local snapshots of the certificate and tag catalogs used by recommendations.
+
+The catalogs are small and change rarely, so scoring a job posting walks an
+in-memory list instead of sending a wide ``OR`` of ``LIKE '%x%'`` predicates to
+the database, and the tag dictionary is not re-read for every request. Each
+snapshot is stamped with a version token kept in the Django cache; saving or
+deleting a certificate, tag or certificate-tag link (including admin edits and
+the XLSX uploads, which go through ``save()`` and ``tags.set()``) replaces the
+token. With Redis the token is shared, so every worker rebuilds its snapshot
+on the next request; with the default local-memory cache it is per process,
+and other workers only catch up after ``AI_CERTIFICATE_CORPUS_TTL``, which
+also bounds staleness for writes that bypass model signals (``QuerySet.update``).
+"""
+
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+CORPUS_VERSION_KEY = "skillbridge:certificate-corpus:version"
+TAG_CATALOG_VERSION_KEY = "skillbridge:tag-catalog:version"
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusCertificate:
+    id: int
+    name: str
+    name_lower: str
+    field_blob: str
+    tag_names: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CertificateCorpus:
+    version: str
+    built_at: float
+    certificates: Tuple[CorpusCertificate, ...]
+
+
+@dataclass(frozen=True)
+class TagCatalog:
+    version: str
+    built_at: float
+    lookup: Dict[str, str]  # casefold 된 이름 -> 원래 이름
+    names: Tuple[str, ...]  # 정렬된 태그 이름
+
+
+def _field_blob(certificate) -> str:
+    return " ".join(
+        [
+            certificate.overview or "",
+            certificate.job_roles or "",
+            certificate.exam_method or "",
+            certificate.eligibility or "",
+            certificate.type or "",
+        ]
+    ).lower()
+
+
+def build_corpus(version: str) -> CertificateCorpus:
+    from certificates.models import Certificate
+
+    queryset = Certificate.objects.only(
+        "id", "name", "overview", "job_roles", "exam_method", "eligibility", "type"
+    ).prefetch_related("tags")
+    certificates = tuple(
+        CorpusCertificate(
+            id=certificate.pk,
+            name=certificate.name or "",
+            name_lower=(certificate.name or "").lower(),
+            field_blob=_field_blob(certificate),
+            tag_names=tuple(tag.name for tag in certificate.tags.all() if tag.name),
+        )
+        for certificate in queryset
+    )
+    return CertificateCorpus(version=version, built_at=time.monotonic(), certificates=certificates)
+
+
+def build_tag_catalog(version: str) -> TagCatalog:
+    from certificates.models import Tag
+
+    lookup = {
+        name.casefold(): name
+        for name in Tag.objects.values_list("name", flat=True)
+        if isinstance(name, str) and name.strip()
+    }
+    return TagCatalog(version=version, built_at=time.monotonic(), lookup=lookup, names=tuple(sorted(set(lookup.values()))))
+
+
+def _current_version(key: str) -> str:
+    version = cache.get(key)
+    if version is None:
+        # 토큰이 없거나 캐시에서 밀려났으면 새로 발급한다. 모든 워커가 같은 값을 쓰도록 add 를 사용한다.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+class SnapshotStore(Generic[T]):
+    """Holds the current snapshot and rebuilds it when the shared version token changes."""
+
+    def __init__(self, version_key: str, builder: Callable[[str], T]):
+        self.version_key = version_key
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._snapshot: Optional[T] = None
+
+    @staticmethod
+    def _max_age() -> float:
+        return getattr(settings, "AI_CERTIFICATE_CORPUS_TTL", 600)
+
+    def _is_current(self, snapshot: Optional[T], version: str) -> bool:
+        if snapshot is None or snapshot.version != version:
+            return False
+        max_age = self._max_age()
+        return not max_age or time.monotonic() - snapshot.built_at < max_age
+
+    def get(self) -> T:
+        # 토큰을 먼저 읽고 스냅샷에 찍어 둔다. 빌드 중에 변경되면 다음 요청에서 다시 만든다.
+        version = _current_version(self.version_key)
+        snapshot = self._snapshot
+        if self._is_current(snapshot, version):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._is_current(snapshot, version):
+                snapshot = self._snapshot = self._builder(version)
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Mark every worker's snapshot as stale."""
+        cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+
+
+corpus_store: SnapshotStore[CertificateCorpus] = SnapshotStore(CORPUS_VERSION_KEY, build_corpus)
+tag_catalog_store: SnapshotStore[TagCatalog] = SnapshotStore(TAG_CATALOG_VERSION_KEY, build_tag_catalog)
+
+
+def get_certificate_corpus() -> CertificateCorpus:
+    return corpus_store.get()
+
+
+def get_tag_catalog() -> TagCatalog:
+    return tag_catalog_store.get()
+
+
+def _invalidate_on_change(*stores: SnapshotStore):
+    def invalidate() -> None:
+        for store in stores:
+            store.invalidate()
+
+    def receiver(sender, using=None, action: str = "", **kwargs) -> None:
+        if action.startswith("pre_"):
+            return
+        # 즉시 한 번, 커밋 후 한 번 더 무효화한다. 커밋 전에 다른 워커가 이전 데이터로
+        # 다시 만든 스냅샷이 새 토큰을 달고 남지 않도록 하기 위해서다.
+        invalidate()
+        transaction.on_commit(invalidate, using=using)
+
+    return receiver
+
+
+_on_certificate_change = _invalidate_on_change(corpus_store)
+_on_tag_change = _invalidate_on_change(corpus_store, tag_catalog_store)
+
+
+def connect_signals() -> None:
+    from certificates.models import Certificate, CertificateTag, Tag
+
+    post_save.connect(_on_certificate_change, sender=Certificate, dispatch_uid="certificate-corpus-save")
+    post_delete.connect(_on_certificate_change, sender=Certificate, dispatch_uid="certificate-corpus-delete")
+    # 태그 이름이 바뀌면 자격증 스냅샷의 tag_names 도 달라지므로 두 스냅샷을 모두 무효화한다.
+    post_save.connect(_on_tag_change, sender=Tag, dispatch_uid="tag-catalog-save")
+    post_delete.connect(_on_tag_change, sender=Tag, dispatch_uid="tag-catalog-delete")
+    m2m_changed.connect(_on_certificate_change, sender=Certificate.tags.through, dispatch_uid="certificate-corpus-tags")
+    # 관리자 화면 등에서 연결 모델을 직접 저장·삭제하면 m2m_changed 가 발생하지 않는다.
+    post_save.connect(_on_certificate_change, sender=CertificateTag, dispatch_uid="certificate-tag-save")
+    post_delete.connect(_on_certificate_change, sender=CertificateTag, dispatch_uid="certificate-tag-delete")
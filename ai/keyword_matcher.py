@@ -0,0 +1,70 @@
+"""Multi-keyword substring matcher used by certificate scoring.
+
+All keywords are compiled into a single trie-shaped regular expression wrapped
+in a lookahead, so one ``finditer`` pass over a text reports, for every start
+position, the longest keyword beginning there. Shorter keywords starting at
+the same position are exactly the keyword prefixes of that match, which are
+precomputed. Together this yields every keyword that occurs as a substring
+(like ``keyword in text`` for each keyword), but scanning the text once.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+_END = ""
+
+
+def _build_trie(keywords: Iterable[str]) -> Dict[str, dict]:
+    root: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+    return root
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # 더 긴 키워드를 먼저 시도하도록 끝 표시는 탐욕적 선택(?)으로 둔다.
+    return f"(?:{body})?" if _END in node else body
+
+
+class KeywordMatcher:
+    """Finds which of a fixed set of (already lowercased) keywords occur in a text."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: FrozenSet[str] = frozenset(keyword for keyword in keywords if keyword)
+        trie = _build_trie(self.keywords)
+        self._prefixes: Dict[str, List[str]] = {keyword: self._keyword_prefixes(trie, keyword) for keyword in self.keywords}
+        self._pattern = re.compile(f"(?=({_trie_pattern(trie)}))") if self.keywords else None
+
+    @staticmethod
+    def _keyword_prefixes(trie: Dict[str, dict], keyword: str) -> List[str]:
+        prefixes: List[str] = []
+        node = trie
+        for index, char in enumerate(keyword):
+            node = node[char]
+            if _END in node:
+                prefixes.append(keyword[: index + 1])
+        return prefixes
+
+    def find(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        if self._pattern is None or not text:
+            return found
+        for match in self._pattern.finditer(text):
+            longest = match.group(1)
+            if longest not in found:
+                found.update(self._prefixes[longest])
+        return found
+
+
+@lru_cache(maxsize=256)
+def compile_keyword_matcher(keywords: FrozenSet[str]) -> KeywordMatcher:
+    """Return a (cached) matcher for the keyword set."""
+    return KeywordMatcher(keywords)
@@ -0,0 +1,164 @@
+"""Process-wide registry of OpenAI model clients.
+
+Every ``ChatOpenAI``/``OpenAIEmbeddings`` instance creates its own httpx
+client, so building one per request meant a new connection pool and TLS
+handshake per AI call. Models here are cached per configuration and share
+keep-alive httpx pools: one per process for sync calls and one per event loop
+for async calls, because an ``httpx.AsyncClient`` cannot be reused once the
+loop that opened its connections is closed. Async clients are therefore only
+worth it under ASGI, where the loop lives as long as the worker; async views
+under WSGI run each request in a fresh loop, so the chat view calls the sync
+methods there instead of creating a client per request.
+
+Each async client is closed on its own loop when the loop shuts down: the
+registry parks an async generator on the loop, and ``asyncio.run`` (used by
+uvicorn and asgiref) closes every pending async generator before closing the
+loop.
+"""
+
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+from django.conf import settings
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=getattr(settings, "AI_HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=getattr(settings, "AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+        keepalive_expiry=getattr(settings, "AI_HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def _close_on_loop_shutdown(client: httpx.AsyncClient, forget: Callable[[], None]) -> AsyncIterator[None]:
+    """Return an async generator, already started on the running loop, that closes ``client`` when finalized."""
+
+    async def closer() -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            forget()
+            await client.aclose()
+
+    agen = closer()
+    # 첫 asend 가 실행 중인 루프의 async generator 훅에 등록하고, 첫 yield 까지는 await 없이 진행된다.
+    try:
+        agen.asend(None).send(None)
+    except StopIteration:
+        pass
+    return agen
+
+
+class _ClientRegistry:
+    """Thread-safe LRU of model clients keyed by configuration (and event loop for async use)."""
+
+    def __init__(self, max_models: int = 32):
+        self._lock = threading.Lock()
+        self._max_models = max_models
+        self._http_client: Optional[httpx.Client] = None
+        self._sync_models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, OrderedDict, AsyncIterator[None]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _forget_loop(self, loop_ref: "weakref.ReferenceType[asyncio.AbstractEventLoop]") -> None:
+        loop = loop_ref()
+        if loop is not None:
+            with self._lock:
+                self._loop_state.pop(loop, None)
+
+    def get(self, key: Hashable, factory: Callable[[httpx.Client, Optional[httpx.AsyncClient]], Any]) -> Any:
+        loop = _running_loop()
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=_limits(), follow_redirects=True)
+            if loop is None:
+                async_client, models = None, self._sync_models
+            else:
+                state = self._loop_state.get(loop)
+                if state is None:
+                    client = httpx.AsyncClient(limits=_limits(), follow_redirects=True)
+                    # 루프는 닫히기 전에 이 generator 를 정리하며 클라이언트를 닫고 루프 상태를 비운다.
+                    loop_ref = weakref.ref(loop)
+                    closer = _close_on_loop_shutdown(client, lambda: self._forget_loop(loop_ref))
+                    state = (client, OrderedDict(), closer)
+                    self._loop_state[loop] = state
+                async_client, models, _closer = state
+
+            model = models.get(key)
+            if model is not None:
+                models.move_to_end(key)
+                return model
+            model = factory(self._http_client, async_client)
+            models[key] = model
+            if len(models) > self._max_models:
+                models.popitem(last=False)
+            return model
+
+
+_registry = _ClientRegistry()
+
+
+def get_chat_model(*, api_key: str, model: str, temperature: float, json_mode: bool = False) -> ChatOpenAI:
+    """Return a shared ``ChatOpenAI`` for the given settings."""
+    model_kwargs: Dict[str, Any] = {"response_format": {"type": "json_object"}} if json_mode else {}
+
+    def build(http_client: httpx.Client, http_async_client: Optional[httpx.AsyncClient]) -> ChatOpenAI:
+        return ChatOpenAI(
+            api_key=api_key,
+            model=model,
+            temperature=temperature,
+            model_kwargs=model_kwargs,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+
+    return _registry.get(("chat", api_key, model, float(temperature), json_mode), build)
+
+
+def get_embeddings_model(*, api_key: str, model: str, timeout: Optional[float] = None) -> OpenAIEmbeddings:
+    """Return a shared ``OpenAIEmbeddings`` for the given settings."""
+
+    def build(http_client: httpx.Client, http_async_client: Optional[httpx.AsyncClient]) -> OpenAIEmbeddings:
+        return OpenAIEmbeddings(
+            api_key=api_key,
+            model=model,
+            timeout=timeout,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+
+    return _registry.get(("embeddings", api_key, model, timeout), build)
+
+
+class SharedOpenAIEmbeddings:
+    """Embedder that resolves the shared ``OpenAIEmbeddings`` for the calling context on each call."""
+
+    def __init__(self, *, api_key: str, model: str, timeout: Optional[float] = None):
+        self._api_key = api_key
+        self._model = model
+        self._timeout = timeout
+
+    def _client(self) -> OpenAIEmbeddings:
+        return get_embeddings_model(api_key=self._api_key, model=self._model, timeout=self._timeout)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._client().embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._client().embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self._client().aembed_query(text)
@@ -0,0 +1,20 @@
+from prometheus_client import Counter
+
+# /metrics/ (django-prometheus) 로 함께 노출된다.
+SEMANTIC_CACHE_REQUESTS = Counter(
+    "skillbridge_ai_semantic_cache_requests_total",
+    "Chat semantic cache lookups by result.",
+    ["result"],
+)
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "skillbridge_ai_single_flight_requests_total",
+    "AI cache misses by whether the request computed the value (leader) or waited for another (coalesced).",
+    ["result"],
+)
+
+OCR_CACHE_REQUESTS = Counter(
+    "skillbridge_ai_ocr_cache_requests_total",
+    "OCR result cache lookups (keyed by image SHA-256 and language) by result.",
+    ["result"],
+)
@@ -0,0 +1,185 @@
+"""Bounded worker pool for tesseract OCR.
+
+``pytesseract`` runs one tesseract subprocess per image and waits for it, which
+used to block a web worker for seconds per screenshot and OCR multi-image
+pages one by one. Jobs here run in a process pool (``AI_OCR_WORKERS``, default
+2) fed from a bounded queue: at most ``AI_OCR_MAX_PENDING`` jobs may
+be queued or running, further submissions wait up to ``AI_OCR_TIMEOUT`` for a
+slot and then fail fast. Every job also has its own ``AI_OCR_TIMEOUT``, enforced
+inside the worker (tesseract is killed) and while waiting for the result.
+
+This module is imported by pool processes, so it must not import Django models
+or anything that needs configured settings at import time.
+
+Each web worker process owns its own pool, so the worker limit is per process:
+a server with N web workers runs up to N × ``AI_OCR_WORKERS`` tesseract jobs.
+"""
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Sequence
+
+from django.conf import settings
+from PIL import Image
+
+try:
+    import pytesseract
+    from pytesseract import TesseractNotFoundError, TesseractError
+except ImportError:  # pragma: no cover - optional dependency
+    pytesseract = None  # type: ignore[assignment]
+    TesseractNotFoundError = TesseractError = RuntimeError  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# 작업자 안의 tesseract 타임아웃이 먼저 걸리도록 결과 대기에는 여유를 둔다.
+_RESULT_GRACE_SECONDS = 5.0
+# 웹 워커 프로세스마다 풀이 따로 생기므로 코어 수가 아닌 작은 고정값을 기본으로 한다.
+DEFAULT_OCR_WORKERS = 2
+
+
+class OcrError(Exception):
+    """이미지에서 텍스트 추출 중 발생한 오류."""
+
+
+def run_ocr(image_bytes: bytes, lang: str, timeout: float = 0) -> str:
+    """OCR one image. This is the pool worker entry point."""
+    if pytesseract is None:
+        raise OcrError("pytesseract 라이브러리가 설치되어 있지 않습니다. requirements.txt를 확인하세요.")
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+    except Exception as exc:
+        raise OcrError(f"이미지를 열 수 없습니다: {exc}") from exc
+
+    try:
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+
+        text = pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+    except TesseractNotFoundError as exc:  # pragma: no cover
+        raise OcrError("Tesseract OCR 실행 파일을 찾을 수 없습니다. 서버에 tesseract-ocr을 설치하세요.") from exc
+    except TesseractError as exc:  # pragma: no cover
+        raise OcrError(f"OCR 처리 중 오류가 발생했습니다: {exc}") from exc
+    except RuntimeError as exc:
+        # pytesseract 는 타임아웃을 RuntimeError("Tesseract process timeout") 로 알린다.
+        if "timeout" in str(exc).lower():
+            raise OcrError("OCR 처리 시간이 초과되었습니다.") from exc
+        raise OcrError(f"OCR 처리 중 오류가 발생했습니다: {exc}") from exc
+    finally:
+        image.close()
+
+    return text.strip()
+
+
+def _process_executor(workers: int) -> Executor:
+    # 스레드가 있는 웹 프로세스를 fork 하지 않도록 spawn 으로 작업자를 띄운다.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class OcrPool:
+    """Runs :func:`run_ocr` jobs in a bounded pool. ``workers=0`` runs them inline."""
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor_factory: Callable[[int], Executor] = _process_executor,
+    ):
+        self.workers = workers if workers is not None else getattr(settings, "AI_OCR_WORKERS", DEFAULT_OCR_WORKERS)
+        pending = max_pending if max_pending is not None else getattr(settings, "AI_OCR_MAX_PENDING", 0)
+        self.max_pending = pending or max(1, self.workers) * 4
+        self.timeout = timeout if timeout is not None else getattr(settings, "AI_OCR_TIMEOUT", 30.0)
+        self._executor_factory = executor_factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self.workers)
+            return self._executor
+
+    def _reset(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, image_bytes: bytes, lang: str) -> Future:
+        if self.workers <= 0:
+            future: Future = Future()
+            try:
+                future.set_result(run_ocr(image_bytes, lang, self.timeout))
+            except OcrError as exc:
+                future.set_exception(exc)
+            return future
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OcrError("OCR 요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.")
+        executor = self._get_executor()
+        try:
+            future = executor.submit(run_ocr, image_bytes, lang, self.timeout)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            self._slots.release()
+            self._reset(executor)
+            raise OcrError("OCR 작업자를 사용할 수 없습니다. 잠시 후 다시 시도해주세요.") from exc
+        future.add_done_callback(lambda _future: self._slots.release())
+        future.executor = executor  # type: ignore[attr-defined]
+        return future
+
+    def result(self, future: Future) -> str:
+        try:
+            return future.result(timeout=self.timeout + _RESULT_GRACE_SECONDS if self.timeout else None)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            raise OcrError("OCR 처리 시간이 초과되었습니다.") from exc
+        except BrokenProcessPool as exc:
+            logger.warning("OCR 작업자 프로세스가 비정상 종료되어 풀을 다시 만듭니다: %s", exc)
+            self._reset(future.executor)  # type: ignore[attr-defined]
+            raise OcrError("OCR 처리 중 작업자가 종료되었습니다.") from exc
+
+    def extract(self, image_bytes: bytes, lang: str) -> str:
+        return self.result(self.submit(image_bytes, lang))
+
+    def extract_many(self, images: Sequence[bytes], lang: str) -> List[Optional[str]]:
+        """OCR several images in parallel; a failed image yields ``None`` at its position."""
+        futures: List[Optional[Future]] = []
+        for image_bytes in images:
+            try:
+                futures.append(self.submit(image_bytes, lang))
+            except OcrError as exc:
+                logger.debug("OCR 작업 제출 실패: %s", exc)
+                futures.append(None)
+
+        texts: List[Optional[str]] = []
+        for future in futures:
+            if future is None:
+                texts.append(None)
+                continue
+            try:
+                texts.append(self.result(future))
+            except OcrError as exc:
+                logger.debug("이미지 OCR 실패: %s", exc)
+                texts.append(None)
+        return texts
+
+
+_ocr_pool: Optional[OcrPool] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OcrPool:
+    """Return the process-wide OCR pool (created on first use)."""
+    global _ocr_pool  # noqa: PLW0603
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = OcrPool()
+        return _ocr_pool
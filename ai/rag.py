@@ -1,12 +1,26 @@
+import asyncio
+import hashlib
 import json
 import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
 
 import numpy as np
 from decouple import config
-from langchain_openai import OpenAIEmbeddings
+from django.conf import settings
+from django.core.cache import cache
+
+from .keyword_matcher import KeywordMatcher
+from .llm import SharedOpenAIEmbeddings
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +34,584 @@ class RagHit:
     text: str
     metadata: Dict[str, Any]
     score: float
+    fused_score: Optional[float] = None
+
+
+INDEX_FORMAT_VERSION = 1
+FILTERABLE_FIELDS = ("certificate_id", "type", "year")
+DEFAULT_INDEX_PATH = "data/rag/index.npy"
+LEGACY_INDEX_PATH = "data/rag/index.json"
 
 
 def _resolve_index_path(path: Optional[str] = None) -> Path:
-    configured = path or config("RAG_INDEX_PATH", default="data/rag/index.json")
-    return Path(configured).expanduser().resolve()
+    configured = path or config("RAG_INDEX_PATH", default=DEFAULT_INDEX_PATH)
+    resolved = Path(configured).expanduser().resolve()
+    if configured == DEFAULT_INDEX_PATH and not resolved.exists():
+        # 바이너리 인덱스를 아직 만들지 않은 환경에서는 기존 JSON 인덱스를 그대로 사용한다.
+        legacy = Path(LEGACY_INDEX_PATH).expanduser().resolve()
+        if legacy.exists():
+            return legacy
+    return resolved
+
+
+def metadata_sidecar_path(matrix_path: Path) -> Path:
+    """Return the metadata sidecar path that accompanies a binary ``.npy`` matrix."""
+    return matrix_path.with_suffix(".meta.json")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so cosine similarity becomes a plain dot product."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def embedder_sidecar_path(matrix_path: Path) -> Path:
+    """Return the path of the fitted local embedder state that accompanies an index."""
+    return matrix_path.with_suffix(".embedder.npz")
+
+
+def _default_file_mode() -> int:
+    # umask 는 바꿔야만 읽을 수 있으므로 곧바로 되돌린다.
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _atomic_write(path: Path, write) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+        # mkstemp 는 0600 으로 만들므로, 다른 사용자로 도는 서버도 읽을 수 있게 일반 파일 권한으로 맞춘다.
+        os.chmod(tmp_name, _default_file_mode())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def save_binary_index(
+    path: Path,
+    *,
+    documents: List[Dict[str, Any]],
+    embeddings: np.ndarray,
+    model_name: str,
+) -> Path:
+    """Write ``embeddings`` as a float32 ``.npy`` matrix plus a JSON metadata sidecar.
+
+    Rows are stored L2-normalized so the memory-mapped matrix can be searched
+    as-is without a per-process normalized copy. An IVF sidecar left by an
+    earlier build is removed, since its lists describe the previous matrix.
+    """
+    matrix = np.ascontiguousarray(normalize_rows(embeddings))
+    if matrix.ndim != 2 or matrix.shape[0] != len(documents):
+        raise ValueError("embedding matrix must be 2-D with one row per document.")
+
+    records = []
+    for doc in documents:
+        record = dict(doc)
+        record.pop("embedding", None)
+        records.append(record)
+
+    meta = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "model": model_name,
+        "document_count": len(records),
+        "dimension": int(matrix.shape[1]),
+        "normalized": True,
+        "documents": records,
+    }
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    # 행 수가 같아도 문서가 바뀌었으면 이전 IVF 리스트는 틀리므로, 행렬을 쓰기 전에 지운다.
+    ivf_sidecar_path(path).unlink(missing_ok=True)
+    _atomic_write(path, lambda handle: np.save(handle, matrix, allow_pickle=False))
+    _atomic_write(metadata_sidecar_path(path), lambda handle: handle.write(meta_bytes))
+    return path
+
+
+def _load_binary_index(index_path: Path) -> Tuple[List[Dict[str, Any]], np.ndarray, Optional[str], bool]:
+    meta_path = metadata_sidecar_path(index_path)
+    if not meta_path.exists():
+        raise RagRetrieverError(f"RAG 인덱스 메타데이터 파일을 찾을 수 없습니다: {meta_path}")
+
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise RagRetrieverError(f"RAG 인덱스 메타데이터를 파싱하지 못했습니다: {exc}") from exc
+
+    try:
+        # mmap 으로 열어 모든 워커 프로세스가 OS 페이지 캐시를 공유하도록 한다.
+        matrix = np.load(index_path, mmap_mode="r", allow_pickle=False)
+    except (OSError, ValueError) as exc:
+        raise RagRetrieverError(f"RAG 임베딩 행렬을 읽지 못했습니다: {exc}") from exc
+
+    documents: List[Dict[str, Any]] = list(meta.get("documents") or [])
+    if not documents:
+        raise RagRetrieverError("RAG 인덱스에 문서가 없습니다.")
+    if matrix.ndim != 2 or matrix.shape[0] != len(documents):
+        raise RagRetrieverError("RAG 임베딩 행렬과 메타데이터의 문서 수가 일치하지 않습니다.")
+    if matrix.dtype != np.float32:
+        matrix = matrix.astype(np.float32)
+
+    return documents, matrix, meta.get("model"), bool(meta.get("normalized"))
+
+
+def _load_json_index(index_path: Path) -> Tuple[List[Dict[str, Any]], np.ndarray, Optional[str], bool]:
+    try:
+        payload = json.loads(index_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise RagRetrieverError(f"RAG 인덱스 파일을 파싱하지 못했습니다: {exc}") from exc
+
+    raw_documents: Iterable[Dict[str, Any]] = payload.get("documents") or []
+    if not raw_documents:
+        raise RagRetrieverError("RAG 인덱스에 문서가 없습니다.")
+
+    documents: List[Dict[str, Any]] = []
+    vectors: List[np.ndarray] = []
+    for item in raw_documents:
+        text = item.get("text")
+        vector = item.get("embedding")
+        if not text or not vector:
+            continue
+        try:
+            vector_arr = np.asarray(vector, dtype=np.float32)
+        except ValueError:
+            continue
+        doc = dict(item)
+        doc.pop("embedding", None)
+        documents.append(doc)
+        vectors.append(vector_arr)
+
+    if not documents or not vectors:
+        raise RagRetrieverError("유효한 문서를 RAG 인덱스에서 찾지 못했습니다.")
+
+    try:
+        matrix = np.vstack(vectors)
+    except ValueError as exc:
+        raise RagRetrieverError("RAG 임베딩 행렬을 구성하지 못했습니다.") from exc
+
+    return documents, matrix, payload.get("model"), False
+
+
+def read_index(index_path: Path) -> Tuple[List[Dict[str, Any]], np.ndarray, Optional[str]]:
+    """Read ``(documents, embeddings, model)`` from a binary or legacy JSON index."""
+    if index_path.suffix == ".json":
+        documents, matrix, model_name, _ = _load_json_index(index_path)
+    else:
+        documents, matrix, model_name, _ = _load_binary_index(index_path)
+    return documents, matrix, model_name
+
+
+def ivf_sidecar_path(matrix_path: Path) -> Path:
+    """Return the path of the optional IVF (approximate search) index for a binary matrix."""
+    return matrix_path.with_suffix(".ivf.npz")
+
+
+class IvfIndex:
+    """Inverted-file ANN index: rows are bucketed by their nearest k-means centroid.
+
+    Search only scores the rows in the ``n_probe`` lists whose centroids are
+    closest to the query, so cost grows with the list size instead of the corpus.
+    """
+
+    def __init__(self, *, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        if self.offsets.shape[0] != self.centroids.shape[0] + 1:
+            raise ValueError("offsets must have one more entry than centroids.")
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @property
+    def row_count(self) -> int:
+        return int(self.rows.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        *,
+        n_lists: int,
+        iterations: int = 20,
+        seed: int = 0,
+        chunk_size: int = 4096,
+    ) -> "IvfIndex":
+        """Run spherical k-means over L2-normalized ``matrix`` rows."""
+        data = normalize_rows(matrix)
+        n_rows = data.shape[0]
+        n_lists = max(1, min(int(n_lists), n_rows))
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(n_rows, size=n_lists, replace=False)].copy()
+
+        def assign(current: np.ndarray) -> np.ndarray:
+            labels = np.empty(n_rows, dtype=np.int64)
+            for start in range(0, n_rows, chunk_size):
+                labels[start : start + chunk_size] = np.argmax(data[start : start + chunk_size] @ current.T, axis=1)
+            return labels
+
+        labels = assign(centroids)
+        for _ in range(max(0, iterations)):
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            counts = np.bincount(labels, minlength=n_lists)
+            empty = np.flatnonzero(counts == 0)
+            if empty.size:
+                # 비어 있는 리스트는 임의의 문서로 다시 시작해 리스트 수를 유지한다.
+                sums[empty] = data[rng.choice(n_rows, size=empty.size, replace=False)]
+            centroids = normalize_rows(sums)
+            new_labels = assign(centroids)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_lists)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        return cls(centroids=centroids, offsets=offsets, rows=order)
+
+    def save(self, path: Path) -> Path:
+        def write(handle) -> None:
+            np.savez(handle, centroids=self.centroids, offsets=self.offsets, rows=self.rows)
+
+        _atomic_write(path, write)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "IvfIndex":
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(centroids=data["centroids"], offsets=data["offsets"], rows=data["rows"])
+        except (OSError, KeyError, ValueError) as exc:
+            raise RagRetrieverError(f"RAG IVF 인덱스를 읽지 못했습니다: {exc}") from exc
+
+    def probe_many(self, queries: np.ndarray, n_probe: int) -> List[np.ndarray]:
+        """Return candidate row ids for each (normalized) query row."""
+        n_probe = max(1, min(int(n_probe), self.n_lists))
+        centroid_scores = np.atleast_2d(queries) @ self.centroids.T
+        if n_probe < self.n_lists:
+            nearest = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            nearest = np.broadcast_to(np.arange(self.n_lists), centroid_scores.shape)
+        return [
+            np.concatenate([self.rows[self.offsets[list_id] : self.offsets[list_id + 1]] for list_id in lists])
+            for lists in nearest
+        ]
+
+    def candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        return self.probe_many(query, n_probe)[0]
+
+
+def _build_posting_lists(documents: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, np.ndarray]]:
+    postings: Dict[str, Dict[str, List[int]]] = {field: defaultdict(list) for field in FILTERABLE_FIELDS}
+    for idx, document in enumerate(documents):
+        for field in FILTERABLE_FIELDS:
+            value = document.get(field)
+            if value is None or value == "":
+                continue
+            postings[field][str(value)].append(idx)
+    return {
+        field: {value: np.asarray(ids, dtype=np.int64) for value, ids in values.items()}
+        for field, values in postings.items()
+    }
+
+
+_LEXICAL_TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+_EMPTY_RANKING: Tuple[np.ndarray, np.ndarray] = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+
+def lexical_tokens(text: str) -> List[str]:
+    """Split text into words, adding character bigrams for Hangul words.
+
+    Bigrams let "정보처리기사는" match "정보처리기사" without a morphological
+    analyzer, while Latin acronyms such as "sqld" stay whole words.
+    """
+    tokens: List[str] = []
+    for word in _LEXICAL_TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_PATTERN.search(word):
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class LexicalIndex:
+    """In-process BM25 inverted index over :func:`lexical_tokens`."""
+
+    def __init__(
+        self,
+        *,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self._vocabulary = vocabulary
+        self._offsets = offsets
+        self._doc_ids = doc_ids
+        self._term_freqs = term_freqs
+        self._k1 = k1
+        doc_count = doc_lengths.shape[0]
+        average_length = float(doc_lengths.mean()) if doc_count else 0.0
+        self._length_norm = (k1 * (1 - b + b * doc_lengths / max(average_length, 1e-9))).astype(np.float32)
+        document_freqs = np.diff(offsets)
+        self._idf = np.log1p((doc_count - document_freqs + 0.5) / (document_freqs + 0.5)).astype(np.float32)
+
+    @property
+    def document_count(self) -> int:
+        return int(self._length_norm.shape[0])
+
+    @classmethod
+    def build(cls, texts: Sequence[str], **kwargs) -> "LexicalIndex":
+        vocabulary: Dict[str, int] = {}
+        postings: List[List[Tuple[int, int]]] = []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = lexical_tokens(text or "")
+            doc_lengths[doc_id] = len(tokens)
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                term_id = vocabulary.setdefault(token, len(vocabulary))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((doc_id, count))
+
+        offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(items) for items in postings])
+        flat = [pair for items in postings for pair in items]
+        doc_ids = np.fromiter((pair[0] for pair in flat), dtype=np.int64, count=len(flat))
+        term_freqs = np.fromiter((pair[1] for pair in flat), dtype=np.float32, count=len(flat))
+        return cls(
+            vocabulary=vocabulary,
+            offsets=offsets,
+            doc_ids=doc_ids,
+            term_freqs=term_freqs,
+            doc_lengths=doc_lengths,
+            **kwargs,
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every document for ``query``."""
+        scores = np.zeros(self.document_count, dtype=np.float32)
+        for token in set(lexical_tokens(query)):
+            term_id = self._vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            docs = self._doc_ids[start:end]
+            freqs = self._term_freqs[start:end]
+            # 한 용어의 포스팅에는 문서가 한 번씩만 나오므로 fancy index 누적이 안전하다.
+            scores[docs] += self._idf[term_id] * freqs * (self._k1 + 1) / (freqs + self._length_norm[docs])
+        return scores
+
+    def normalized_scores(self, query: str) -> np.ndarray:
+        """Return :meth:`scores` divided by the best score any document could reach, in ``[0, 1)``."""
+        tokens = set(lexical_tokens(query))
+        if not tokens:
+            return np.zeros(self.document_count, dtype=np.float32)
+        # 색인에 없는 용어도 가장 드문 용어만큼 상한에 더해, 대부분 모르는 단어인 질의의 점수가 부풀지 않게 한다.
+        max_idf = float(self._idf.max()) if self._idf.size else 1.0
+        idfs = [float(self._idf[self._vocabulary[token]]) if token in self._vocabulary else max_idf for token in tokens]
+        bound = sum(idfs) * (self._k1 + 1)
+        return self.scores(query) / np.float32(max(bound, 1e-9))
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], *, k: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge ranked document id arrays by summing ``1 / (k + rank)``."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking.tolist(), start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    if not fused:
+        return _EMPTY_RANKING
+    ordered = sorted(fused.items(), key=lambda item: -item[1])
+    return (
+        np.fromiter((doc_id for doc_id, _ in ordered), dtype=np.int64, count=len(ordered)),
+        np.fromiter((score for _, score in ordered), dtype=np.float32, count=len(ordered)),
+    )
 
 
 def _resolve_api_key() -> Optional[str]:
     return config("GPT_KEY", default=None) or config("OPENAI_API_KEY", default=None)
 
 
+def normalize_query_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class QueryEmbeddingCache:
+    """Stores query embeddings in the Django cache keyed by (model, normalized query)."""
+
+    def __init__(self, *, model_name: str, timeout: int):
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{self.model_name}|{normalize_query_text(text)}".encode("utf-8")).hexdigest()
+        return f"skillbridge:rag-embedding:{digest}"
+
+    @staticmethod
+    def _decode(raw: Any) -> Optional[np.ndarray]:
+        if not isinstance(raw, (bytes, bytearray)) or not raw or len(raw) % 4:
+            return None
+        return np.frombuffer(bytes(raw), dtype=np.float32)
+
+    def _found(self, keys: Dict[str, str], stored: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        for key, raw in stored.items():
+            vector = self._decode(raw)
+            if vector is not None:
+                found[keys[key]] = vector
+        return found
+
+    def _payload(self, vectors: Dict[str, np.ndarray]) -> Dict[str, bytes]:
+        return {
+            self._key(text): np.asarray(vector, dtype=np.float32).tobytes()
+            for text, vector in vectors.items()
+        }
+
+    def get_many(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        keys = {self._key(text): text for text in texts}
+        try:
+            stored = cache.get_many(list(keys))
+        except Exception as exc:  # pragma: no cover - cache backend failure
+            logger.debug("RAG 임베딩 캐시 조회 실패: %s", exc)
+            return {}
+        return self._found(keys, stored)
+
+    def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        try:
+            cache.set_many(self._payload(vectors), timeout=self.timeout)
+        except Exception as exc:  # pragma: no cover - cache backend failure
+            logger.debug("RAG 임베딩 캐시 저장 실패: %s", exc)
+
+    async def aget_many(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        keys = {self._key(text): text for text in texts}
+        try:
+            stored = await cache.aget_many(list(keys))
+        except Exception as exc:  # pragma: no cover - cache backend failure
+            logger.debug("RAG 임베딩 캐시 조회 실패: %s", exc)
+            return {}
+        return self._found(keys, stored)
+
+    async def aset_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        try:
+            await cache.aset_many(self._payload(vectors), timeout=self.timeout)
+        except Exception as exc:  # pragma: no cover - cache backend failure
+            logger.debug("RAG 임베딩 캐시 저장 실패: %s", exc)
+
+
+class Embedder(Protocol):
+    """Subset of the LangChain ``Embeddings`` interface the retriever relies on."""
+
+    def embed_query(self, text: str) -> Sequence[float]: ...
+
+    def embed_documents(self, texts: List[str]) -> Sequence[Sequence[float]]: ...
+
+
+LOCAL_MODEL_PREFIX = "local-hash-ngram"
+
+
+def is_local_model(model_name: Optional[str]) -> bool:
+    return bool(model_name) and model_name.startswith(LOCAL_MODEL_PREFIX)
+
+
+class HashingNgramEmbedder:
+    """CPU-only embedder: character n-grams hashed into a fixed space, weighted by TF-IDF.
+
+    Counts are sublinear (``1 + log tf``) and the IDF vector is fitted on the
+    indexed documents, so the same fitted instance must embed both documents
+    and queries. Recall is below a neural model, but queries need no network.
+    """
+
+    def __init__(self, *, idf: np.ndarray, ngram_range: Tuple[int, int] = (2, 4)):
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+        if self.idf.ndim != 1 or not len(self.idf):
+            raise ValueError("idf must be a non-empty vector.")
+        if not 1 <= self.ngram_range[0] <= self.ngram_range[1]:
+            raise ValueError("invalid n-gram range.")
+
+    @property
+    def dimension(self) -> int:
+        return int(self.idf.shape[0])
+
+    @property
+    def model_name(self) -> str:
+        return f"{LOCAL_MODEL_PREFIX}-{self.dimension}"
+
+    @staticmethod
+    def _buckets(text: str, dimension: int, ngram_range: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        normalized = f" {' '.join(unicodedata.normalize('NFKC', text).casefold().split())} "
+        hashes = [
+            zlib.crc32(normalized[start : start + size].encode("utf-8"))
+            for size in range(ngram_range[0], ngram_range[1] + 1)
+            for start in range(len(normalized) - size + 1)
+        ]
+        if not hashes:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        buckets, counts = np.unique(np.asarray(hashes, dtype=np.int64) % dimension, return_counts=True)
+        return buckets, counts.astype(np.float32)
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        *,
+        dimension: int = 1024,
+        ngram_range: Tuple[int, int] = (2, 4),
+    ) -> "HashingNgramEmbedder":
+        document_frequency = np.zeros(dimension, dtype=np.float64)
+        for text in texts:
+            buckets, _ = cls._buckets(text, dimension, ngram_range)
+            document_frequency[buckets] += 1
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0
+        return cls(idf=idf.astype(np.float32), ngram_range=ngram_range)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets, counts = self._buckets(text, self.dimension, self.ngram_range)
+            vectors[row, buckets] = (1.0 + np.log(counts)) * self.idf[buckets]
+        return normalize_rows(vectors)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+    def save(self, path: Path) -> Path:
+        def write(handle) -> None:
+            np.savez(handle, idf=self.idf, ngram_range=np.asarray(self.ngram_range, dtype=np.int64))
+
+        _atomic_write(path, write)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "HashingNgramEmbedder":
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(idf=data["idf"], ngram_range=tuple(data["ngram_range"].tolist()))
+        except (OSError, KeyError, ValueError) as exc:
+            raise RagRetrieverError(f"로컬 임베딩 설정을 읽지 못했습니다: {exc}") from exc
+
+
 class CertificateRagRetriever:
     """Lightweight vector-based retriever for certificate knowledge."""
 
@@ -39,8 +620,17 @@ class CertificateRagRetriever:
         *,
         documents: List[Dict[str, Any]],
         embeddings: np.ndarray,
-        embedding_client: OpenAIEmbeddings,
+        embedding_client: Optional[Embedder],
         model_name: str,
+        normalized: bool = False,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        ivf_index: Optional[IvfIndex] = None,
+        n_probe: int = 8,
+        lexical_index: Optional[LexicalIndex] = None,
+        fusion_depth: int = 20,
+        rrf_k: int = 60,
+        lexical_min_ratio: float = 0.3,
+        lexical_min_score: float = 0.1,
     ):
         if not len(documents):
             raise ValueError("documents must not be empty.")
@@ -48,11 +638,31 @@ class CertificateRagRetriever:
             raise ValueError("embedding count must match document count.")
 
         self._documents = documents
-        self._matrix = embeddings.astype(np.float32)
-        self._norms = np.linalg.norm(self._matrix, axis=1)
-        self._norms[self._norms == 0] = 1e-12
+        if normalized:
+            # 이미 정규화된 mmap 행렬은 복사하지 않고 그대로 사용한다.
+            self._matrix = np.asarray(embeddings, dtype=np.float32)
+        else:
+            self._matrix = normalize_rows(embeddings)
         self._embedder = embedding_client
         self._model_name = model_name
+        self._query_cache = query_cache
+        if ivf_index is not None and ivf_index.row_count != len(documents):
+            raise ValueError("IVF index row count must match document count.")
+        self._ivf_index = ivf_index
+        self._n_probe = n_probe
+        self._postings = _build_posting_lists(documents)
+        self._name_matcher = KeywordMatcher(
+            str(doc["name"]).strip().lower() for doc in documents if str(doc.get("name") or "").strip()
+        )
+        if lexical_index is not None and lexical_index.document_count != len(documents):
+            raise ValueError("lexical index document count must match document count.")
+        if embedding_client is None and lexical_index is None:
+            raise ValueError("either an embedding client or a lexical index is required.")
+        self._lexical_index = lexical_index
+        self._fusion_depth = fusion_depth
+        self._rrf_k = rrf_k
+        self._lexical_min_ratio = lexical_min_ratio
+        self._lexical_min_score = lexical_min_score
 
     @classmethod
     def from_index(cls, *, path: Optional[str] = None) -> "CertificateRagRetriever":
@@ -60,106 +670,519 @@ class CertificateRagRetriever:
         if not index_path.exists():
             raise RagRetrieverError(f"RAG 인덱스 파일을 찾을 수 없습니다: {index_path}")
 
-        try:
-            payload = json.loads(index_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
-            raise RagRetrieverError(f"RAG 인덱스 파일을 파싱하지 못했습니다: {exc}") from exc
-
-        model_name = payload.get("model") or config("RAG_EMBEDDING_MODEL", default="text-embedding-3-small")
-        raw_documents: Iterable[Dict[str, Any]] = payload.get("documents") or []
-        if not raw_documents:
-            raise RagRetrieverError("RAG 인덱스에 문서가 없습니다.")
-
-        documents: List[Dict[str, Any]] = []
-        vectors: List[np.ndarray] = []
-        for item in raw_documents:
-            text = item.get("text")
-            vector = item.get("embedding")
-            if not text or not vector:
-                continue
-            try:
-                vector_arr = np.asarray(vector, dtype=np.float32)
-            except ValueError:
-                continue
-            doc = dict(item)
-            doc.pop("embedding", None)
-            documents.append(doc)
-            vectors.append(vector_arr)
+        if index_path.suffix == ".json":
+            documents, matrix, stored_model, normalized = _load_json_index(index_path)
+        else:
+            documents, matrix, stored_model, normalized = _load_binary_index(index_path)
 
-        if not documents or not vectors:
-            raise RagRetrieverError("유효한 문서를 RAG 인덱스에서 찾지 못했습니다.")
+        model_name = stored_model or config("RAG_EMBEDDING_MODEL", default="text-embedding-3-small")
 
-        try:
-            matrix = np.vstack(vectors)
-        except ValueError as exc:
-            raise RagRetrieverError("RAG 임베딩 행렬을 구성하지 못했습니다.") from exc
+        ivf_index: Optional[IvfIndex] = None
+        engine = config("RAG_SEARCH_ENGINE", default="exact").strip().lower()
+        if engine == "ivf":
+            ivf_path = ivf_sidecar_path(index_path)
+            if index_path.suffix != ".json" and ivf_path.exists():
+                ivf_index = IvfIndex.load(ivf_path)
+                if ivf_index.row_count != len(documents):
+                    logger.warning("RAG IVF 인덱스가 현재 행렬과 맞지 않아 전체 검색을 사용합니다.")
+                    ivf_index = None
+            else:
+                logger.warning("RAG IVF 인덱스를 찾을 수 없어 전체 검색을 사용합니다: %s", ivf_path)
+
+        lexical_index: Optional[LexicalIndex] = None
+        if config("RAG_HYBRID_SEARCH", default=True, cast=bool):
+            lexical_index = LexicalIndex.build([doc.get("text") or "" for doc in documents])
 
         api_key = _resolve_api_key()
-        if not api_key:
+        embedder: Optional[Embedder] = None
+        if is_local_model(model_name):
+            embedder = HashingNgramEmbedder.load(embedder_sidecar_path(index_path))
+            if embedder.model_name != model_name or embedder.dimension != matrix.shape[1]:
+                raise RagRetrieverError("로컬 임베딩 설정이 인덱스와 일치하지 않습니다.")
+        elif api_key:
+            embedder = SharedOpenAIEmbeddings(
+                model=model_name,
+                api_key=api_key,
+                timeout=config("RAG_EMBEDDING_TIMEOUT", default=5.0, cast=float),
+            )
+        elif lexical_index is not None:
+            logger.info("GPT_KEY 환경 변수가 없어 RAG 검색을 키워드(BM25) 전용으로 사용합니다.")
+        else:
             raise RagRetrieverError("GPT_KEY 환경 변수가 없어 RAG 검색을 비활성화합니다.")
 
-        embedder = OpenAIEmbeddings(model=model_name, api_key=api_key)
+        # 로컬 임베딩은 캐시 조회보다 계산이 빠르므로 캐시를 쓰지 않는다.
+        cache_timeout = 0 if is_local_model(model_name) else getattr(settings, "AI_RAG_EMBEDDING_CACHE_TTL", 86400)
+        query_cache = QueryEmbeddingCache(model_name=model_name, timeout=cache_timeout) if cache_timeout else None
 
-        return cls(documents=documents, embeddings=matrix, embedding_client=embedder, model_name=model_name)
+        return cls(
+            documents=documents,
+            embeddings=matrix,
+            embedding_client=embedder,
+            model_name=model_name,
+            normalized=normalized,
+            query_cache=query_cache,
+            ivf_index=ivf_index,
+            n_probe=config("RAG_IVF_NPROBE", default=8, cast=int),
+            lexical_index=lexical_index,
+        )
 
     @property
     def model_name(self) -> str:
         return self._model_name
 
-    def search(self, query: str, *, top_k: int = 4, min_score: float = 0.35) -> List[RagHit]:
+    def mentioned_certificates(self, text: str) -> Tuple[str, ...]:
+        """Return the (lowercased) certificate names from the indexed documents that occur in ``text``."""
+        return tuple(sorted(self._name_matcher.find((text or "").lower())))
+
+    def search(
+        self,
+        query: str,
+        *,
+        top_k: int = 4,
+        min_score: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[RagHit]:
+        """Return the best matching documents for ``query``.
+
+        ``filters`` restricts scoring to documents whose metadata matches, e.g.
+        ``{"certificate_id": "12", "type": "certificate_statistics"}``. A list
+        value matches any of its items; different fields must all match.
+
+        With a lexical index the vector and BM25 rankings are merged by
+        reciprocal-rank fusion: hits are ordered by ``RagHit.fused_score`` while
+        ``RagHit.score`` stays the cosine similarity. BM25 matches must reach a
+        normalized score of ``lexical_min_score``, so off-topic queries do not
+        pull in documents that only share a common word. If the query cannot be
+        embedded only the lexical ranking is used and ``score`` is the
+        normalized BM25 score.
+        """
         if not query or not query.strip():
             return []
 
-        try:
-            query_vector = np.asarray(self._embedder.embed_query(query), dtype=np.float32)
-        except Exception as exc:  # pragma: no cover - relies on external service
-            logger.warning("RAG 임베딩 생성 실패: %s", exc)
+        filtered_rows = self._filter_rows(filters)
+        if filtered_rows is not None and not filtered_rows.size:
             return []
 
-        query_norm = np.linalg.norm(query_vector)
-        if query_norm == 0:
+        query_vector = self._embed_query(query)
+        return self._search_with_vector(query, query_vector, filtered_rows, top_k=top_k, min_score=min_score)
+
+    async def asearch(
+        self,
+        query: str,
+        *,
+        top_k: int = 4,
+        min_score: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[RagHit]:
+        """Async variant of :meth:`search`; only the query embedding is awaited."""
+        if not query or not query.strip():
             return []
 
-        similarities = (self._matrix @ query_vector) / (self._norms * query_norm)
-        if np.isnan(similarities).all():
+        filtered_rows = self._filter_rows(filters)
+        if filtered_rows is not None and not filtered_rows.size:
             return []
 
-        ranked_indices = np.argsort(similarities)[::-1]
+        query_vector = await self._aembed_query(query)
+        return self._search_with_vector(query, query_vector, filtered_rows, top_k=top_k, min_score=min_score)
+
+    def _search_with_vector(
+        self,
+        query: str,
+        query_vector: Optional[np.ndarray],
+        filtered_rows: Optional[np.ndarray],
+        *,
+        top_k: int,
+        min_score: float,
+    ) -> List[RagHit]:
+        vector_ranking = None
+        if query_vector is not None:
+            rows = filtered_rows
+            if rows is None and self._ivf_index is not None:
+                rows = self._ivf_index.candidates(query_vector, self._n_probe)
+            vector_ranking = self._vector_ranking(query_vector, rows, top_k=top_k, min_score=min_score)
+        return self._finalize(query, vector_ranking, filtered_rows, top_k=top_k, query_vector=query_vector)
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        *,
+        top_k: int = 4,
+        min_score: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[List[RagHit]]:
+        """Search several queries with one embedding round-trip and one matrix product.
+
+        Results are returned in the same order as ``queries``; blank queries
+        yield an empty list. ``filters`` behaves as in :meth:`search` and
+        applies to every query.
+        """
+        results: List[List[RagHit]] = [[] for _ in queries]
+        positions = [index for index, query in enumerate(queries) if query and query.strip()]
+        if not positions:
+            return results
+
+        filtered_rows = self._filter_rows(filters)
+        if filtered_rows is not None and not filtered_rows.size:
+            return results
+
+        embedded = self._embed_queries([queries[index] for index in positions])
+        if embedded is None:
+            for position in positions:
+                results[position] = self._finalize(queries[position], None, filtered_rows, top_k=top_k)
+            return results
+
+        vectors = np.vstack([embedded[queries[index]] for index in positions])
+        norms = np.linalg.norm(vectors, axis=1)
+        valid = (norms > 0) & np.isfinite(norms)
+        vectors = vectors / np.where(valid, norms, 1.0)[:, None]
+
+        probed: Optional[List[np.ndarray]] = None
+        scores: Optional[np.ndarray] = None
+        if filtered_rows is not None:
+            scores = vectors @ self._matrix[filtered_rows].T
+        elif self._ivf_index is not None:
+            probed = self._ivf_index.probe_many(vectors, self._n_probe)
+        else:
+            scores = vectors @ self._matrix.T
+
+        for row, position in enumerate(positions):
+            vector_ranking = None
+            if valid[row]:
+                if probed is not None:
+                    vector_ranking = self._vector_ranking(vectors[row], probed[row], top_k=top_k, min_score=min_score)
+                else:
+                    vector_ranking = self._rank(
+                        scores[row], depth=self._candidate_depth(top_k), min_score=min_score, rows=filtered_rows
+                    )
+            results[position] = self._finalize(
+                queries[position], vector_ranking, filtered_rows, top_k=top_k, query_vector=vectors[row]
+            )
+        return results
+
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Return the normalized (and cached) embedding of ``query``, or ``None`` when unavailable."""
+        if not query or not query.strip():
+            return None
+        return self._embed_query(query)
+
+    async def aembed_query(self, query: str) -> Optional[np.ndarray]:
+        if not query or not query.strip():
+            return None
+        return await self._aembed_query(query)
+
+    @staticmethod
+    def _unit_query(query_vector: np.ndarray) -> Optional[np.ndarray]:
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0 or not np.isfinite(query_norm):
+            return None
+        return query_vector / query_norm
+
+    def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Return the L2-normalized query embedding, or ``None`` when it is unavailable."""
+        query_vector = self._query_cache.get_many([query]).get(query) if self._query_cache else None
+        if query_vector is None:
+            if self._embedder is None:
+                return None
+            try:
+                query_vector = np.asarray(self._embedder.embed_query(query), dtype=np.float32)
+            except Exception as exc:  # pragma: no cover - relies on external service
+                logger.warning("RAG 임베딩 생성 실패: %s", exc)
+                return None
+            if self._query_cache:
+                self._query_cache.set_many({query: query_vector})
+        return self._unit_query(query_vector)
+
+    async def _aembed_query(self, query: str) -> Optional[np.ndarray]:
+        """Async counterpart of :meth:`_embed_query` that never blocks the event loop."""
+        query_vector = (await self._query_cache.aget_many([query])).get(query) if self._query_cache else None
+        if query_vector is None:
+            if self._embedder is None:
+                return None
+            aembed_query = getattr(self._embedder, "aembed_query", None)
+            try:
+                if aembed_query is not None:
+                    raw = await aembed_query(query)
+                else:
+                    raw = await asyncio.to_thread(self._embedder.embed_query, query)
+                query_vector = np.asarray(raw, dtype=np.float32)
+            except Exception as exc:  # pragma: no cover - relies on external service
+                logger.warning("RAG 임베딩 생성 실패: %s", exc)
+                return None
+            if self._query_cache:
+                await self._query_cache.aset_many({query: query_vector})
+        return self._unit_query(query_vector)
+
+    def _embed_queries(self, queries: Sequence[str]) -> Optional[Dict[str, np.ndarray]]:
+        unique_queries = list(dict.fromkeys(queries))
+        embedded = self._query_cache.get_many(unique_queries) if self._query_cache else {}
+        missing = [query for query in unique_queries if query not in embedded]
+        if not missing:
+            return embedded
+        if self._embedder is None:
+            return None
+
+        try:
+            fetched = np.asarray(self._embedder.embed_documents(missing), dtype=np.float32)
+        except Exception as exc:  # pragma: no cover - relies on external service
+            logger.warning("RAG 배치 임베딩 생성 실패: %s", exc)
+            return None
+
+        if fetched.ndim != 2 or fetched.shape[0] != len(missing):
+            logger.warning("RAG 배치 임베딩 결과 수가 질의 수와 일치하지 않습니다.")
+            return None
+
+        fresh = dict(zip(missing, fetched))
+        if self._query_cache:
+            self._query_cache.set_many(fresh)
+        embedded.update(fresh)
+        return embedded
+
+    def _filter_rows(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Intersect the posting lists selected by ``filters``; ``None`` means no restriction."""
+        if not filters:
+            return None
+
+        rows: Optional[np.ndarray] = None
+        for field, expected in filters.items():
+            postings = self._postings.get(field)
+            if postings is None:
+                raise ValueError(f"지원하지 않는 RAG 필터 필드입니다: {field}")
+            values = expected if isinstance(expected, (list, tuple, set, frozenset)) else [expected]
+            parts = [postings[str(value)] for value in values if str(value) in postings]
+            if not parts:
+                return np.empty(0, dtype=np.int64)
+            matched = parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if not rows.size:
+                break
+        return rows
+
+    def _candidate_depth(self, top_k: int) -> int:
+        # 융합할 때는 각 순위에서 top_k 보다 넉넉히 가져와야 순위 합산이 의미가 있다.
+        return max(top_k, self._fusion_depth) if self._lexical_index is not None else top_k
+
+    def _vector_ranking(
+        self,
+        query_vector: np.ndarray,
+        rows: Optional[np.ndarray],
+        *,
+        top_k: int,
+        min_score: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        depth = self._candidate_depth(top_k)
+        if rows is None:
+            return self._rank(self._matrix @ query_vector, depth=depth, min_score=min_score)
+        if not rows.size:
+            return _EMPTY_RANKING
+        return self._rank(self._matrix[rows] @ query_vector, depth=depth, min_score=min_score, rows=rows)
+
+    def _lexical_ranking(self, query: str, rows: Optional[np.ndarray], *, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self._lexical_index.normalized_scores(query)
+        if rows is not None:
+            scores = scores[rows]
+        best = float(scores.max()) if scores.size else 0.0
+        if best < self._lexical_min_score or best <= 0:
+            return _EMPTY_RANKING
+        # 바이그램 하나만 겹친 문서처럼 점수가 낮은 꼬리는 잘라낸다.
+        threshold = max(best * self._lexical_min_ratio, self._lexical_min_score, np.finfo(np.float32).tiny)
+        return self._rank(scores, depth=self._candidate_depth(top_k), min_score=threshold, rows=rows)
+
+    @staticmethod
+    def _rank(
+        scores: np.ndarray,
+        *,
+        depth: int,
+        min_score: float,
+        rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(document_ids, scores)`` for the best ``depth`` scores at or above ``min_score``.
+
+        ``rows`` maps score positions to document ids when only a subset was scored.
+        """
+        if depth <= 0:
+            return _EMPTY_RANKING
+
+        # NaN 은 비교 결과가 False 이므로 min_score 필터에서 함께 제외된다.
+        candidates = np.flatnonzero(scores >= min_score)
+        if not candidates.size:
+            return _EMPTY_RANKING
+        if candidates.size > depth:
+            partition = np.argpartition(scores[candidates], -depth)[-depth:]
+            candidates = candidates[partition]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        ids = rows[ranked] if rows is not None else ranked
+        return ids, scores[ranked]
+
+    def _finalize(
+        self,
+        query: str,
+        vector_ranking: Optional[Tuple[np.ndarray, np.ndarray]],
+        filtered_rows: Optional[np.ndarray],
+        *,
+        top_k: int,
+        query_vector: Optional[np.ndarray] = None,
+    ) -> List[RagHit]:
+        if self._lexical_index is None:
+            if vector_ranking is None:
+                return []
+            return self._build_hits(*vector_ranking, top_k=top_k)
+
+        lexical_ranking = self._lexical_ranking(query, filtered_rows, top_k=top_k)
+        if vector_ranking is None or query_vector is None:
+            return self._build_hits(*lexical_ranking, top_k=top_k)
+        fused_ids, fused_scores = reciprocal_rank_fusion([vector_ranking[0], lexical_ranking[0]], k=self._rrf_k)
+        fused_ids = fused_ids[: max(0, top_k)]
+        # 순위는 RRF 로 정하되 score 에는 어휘 검색으로만 들어온 문서도 코사인 유사도를 넣는다.
+        cosine = self._matrix[fused_ids] @ query_vector if fused_ids.size else fused_scores[:0]
+        return self._build_hits(fused_ids, cosine, top_k=top_k, fused_scores=fused_scores)
+
+    def _build_hits(
+        self,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        *,
+        top_k: int,
+        fused_scores: Optional[np.ndarray] = None,
+    ) -> List[RagHit]:
         hits: List[RagHit] = []
-        for idx in ranked_indices[:top_k]:
-            score = float(similarities[idx])
-            if np.isnan(score) or score < min_score:
-                continue
+        for rank, (idx, score) in enumerate(zip(ids[: max(0, top_k)].tolist(), scores[: max(0, top_k)].tolist())):
             document = self._documents[idx]
             text = document.get("text", "").strip()
             if not text:
                 continue
             metadata = {k: v for k, v in document.items() if k != "text"}
-            hits.append(RagHit(text=text, metadata=metadata, score=score))
-
+            fused_score = float(fused_scores[rank]) if fused_scores is not None else None
+            hits.append(RagHit(text=text, metadata=metadata, score=float(score), fused_score=fused_score))
         return hits
 
 
-_cached_retriever: Optional[CertificateRagRetriever] = None
-_retriever_failed: bool = False
+def _index_signature(index_path: Path) -> Optional[Tuple[Tuple[str, int, int], ...]]:
+    """Return ``(name, mtime_ns, size)`` for the index and its sidecars, or ``None`` if it is missing."""
+    paths = [index_path]
+    if index_path.suffix != ".json":
+        paths.extend([metadata_sidecar_path(index_path), ivf_sidecar_path(index_path)])
+    paths.append(embedder_sidecar_path(index_path))
+    signature = []
+    for candidate in paths:
+        try:
+            stat = candidate.stat()
+        except FileNotFoundError:
+            if candidate == index_path:
+                return None
+            continue
+        signature.append((candidate.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
 
 
-def get_certificate_rag_retriever() -> Optional[CertificateRagRetriever]:
-    global _cached_retriever, _retriever_failed  # noqa: PLW0603
-    if _cached_retriever is not None:
-        return _cached_retriever
-    if _retriever_failed:
-        return None
+_NOT_LOADED = object()
 
-    try:
-        _cached_retriever = CertificateRagRetriever.from_index()
-    except RagRetrieverError as exc:
-        _retriever_failed = True
-        logger.info("RAG 검색 비활성화: %s", exc)
-        return None
-    except Exception as exc:  # pragma: no cover - safety catch
-        _retriever_failed = True
-        logger.exception("RAG 검색 초기화 실패: %s", exc)
-        return None
-
-    return _cached_retriever
+
+class RetrieverRegistry:
+    """Keep the active retriever and swap in a new one when the index changes on disk.
+
+    ``get()`` stats the index at most once per ``check_interval`` seconds. A
+    changed index is loaded on a background thread while the current retriever
+    keeps serving, and the reference is replaced only after the load succeeds.
+    Failed loads are retried with exponential backoff; only the very first load
+    of the process runs on the calling thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Optional[str] = None,
+        loader: Optional[Callable[[Optional[str]], CertificateRagRetriever]] = None,
+        check_interval: Optional[float] = None,
+        base_backoff: float = 1.0,
+        max_backoff: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._path = path
+        self._loader = loader or (lambda index_path: CertificateRagRetriever.from_index(path=index_path))
+        self._check_interval = (
+            check_interval
+            if check_interval is not None
+            else config("RAG_RELOAD_CHECK_INTERVAL", default=10.0, cast=float)
+        )
+        self._base_backoff = base_backoff
+        self._max_backoff = (
+            max_backoff if max_backoff is not None else config("RAG_RELOAD_MAX_BACKOFF", default=300.0, cast=float)
+        )
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._current: Optional[CertificateRagRetriever] = None
+        self._loaded_signature: Any = _NOT_LOADED
+        self._failed_signature: Any = _NOT_LOADED
+        self._failures = 0
+        self._retry_at = 0.0
+        self._next_check_at = 0.0
+        self._worker: Optional[threading.Thread] = None
+
+    def get(self) -> Optional[CertificateRagRetriever]:
+        now = self._clock()
+        with self._lock:
+            if now < self._next_check_at or self._worker is not None:
+                return self._current
+            self._next_check_at = now + self._check_interval
+
+            signature = _index_signature(_resolve_index_path(self._path))
+            if signature == self._loaded_signature:
+                return self._current
+            if signature == self._failed_signature and now < self._retry_at:
+                return self._current
+
+            first_load = self._loaded_signature is _NOT_LOADED and self._failed_signature is _NOT_LOADED
+            worker = threading.Thread(
+                target=self._load,
+                args=(signature,),
+                name="rag-index-reload",
+                daemon=True,
+            )
+            self._worker = worker
+
+        if first_load:
+            worker.run()
+        else:
+            worker.start()
+        return self._current
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for an in-flight background load, mainly for tests and scripts."""
+        worker = self._worker
+        if worker is not None and worker.ident is not None:
+            worker.join(timeout)
+
+    def _load(self, signature: Any) -> None:
+        try:
+            retriever = self._loader(self._path)
+        except Exception as exc:
+            with self._lock:
+                self._failures += 1
+                self._failed_signature = signature
+                delay = min(self._max_backoff, self._base_backoff * (2 ** (self._failures - 1)))
+                self._retry_at = self._clock() + delay
+                self._worker = None
+                serving = self._current is not None
+            if isinstance(exc, RagRetrieverError):
+                logger.info("RAG 인덱스 로드 실패 (%.0f초 후 재시도, 기존 인덱스 유지: %s): %s", delay, serving, exc)
+            else:
+                logger.exception("RAG 인덱스 로드 실패 (%.0f초 후 재시도): %s", delay, exc)
+            return
+
+        with self._lock:
+            reloaded = self._current is not None
+            self._current = retriever
+            self._loaded_signature = signature
+            self._failed_signature = _NOT_LOADED
+            self._failures = 0
+            self._worker = None
+        if reloaded:
+            logger.info("RAG 인덱스를 새 버전으로 교체했습니다.")
+
+
+_registry = RetrieverRegistry()
+
+
+def get_certificate_rag_retriever() -> Optional[CertificateRagRetriever]:
+    return _registry.get()
@@ -0,0 +1,155 @@
+"""Soft-TTL (stale-while-revalidate) and negative caching for AI responses.
+
+Values are stored in the Django cache inside a small envelope that records
+until when they are fresh. The cache timeout itself is ``ttl + stale_ttl``:
+after ``ttl`` a read still returns the stale value, and schedules a single
+background refresh (guarded by ``cache.add``, so at most one per key across
+workers). A failed refresh leaves the stale value in place and is not retried
+until its lock expires. Failed computations on a plain miss are remembered for
+``negative_ttl`` seconds so retries do not keep hammering a failing upstream.
+
+Envelopes are serialized to compact JSON bytes with orjson, so every read
+decodes a fresh object that callers may mutate without copying, and Redis
+stores a few hundred bytes instead of a pickled dict.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_DUMP_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised while a recent failure for the same request is negatively cached."""
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: int
+    stale_ttl: int = 0
+    negative_ttl: int = 0
+
+    @classmethod
+    def for_route(cls, route: str, *, ttl: int, stale_ttl: int = 0, negative_ttl: int = 0) -> "CachePolicy":
+        """Read ``AI_<ROUTE>_CACHE_TTL`` / ``_CACHE_STALE_TTL`` / ``_NEGATIVE_CACHE_TTL`` from settings."""
+        prefix = f"AI_{route.upper()}"
+        return cls(
+            ttl=getattr(settings, f"{prefix}_CACHE_TTL", ttl),
+            stale_ttl=getattr(settings, f"{prefix}_CACHE_STALE_TTL", stale_ttl),
+            negative_ttl=getattr(settings, f"{prefix}_NEGATIVE_CACHE_TTL", negative_ttl),
+        )
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: Any
+    stale: bool = False
+    error: Optional[str] = None
+
+    def raise_for_error(self) -> None:
+        if self.error is not None:
+            raise UpstreamUnavailableError(self.error)
+
+
+def _wrap(value: Any, fresh_for: float, error: Optional[str] = None) -> bytes:
+    envelope = {"value": value, "fresh_until": time.time() + fresh_for, "error": error}
+    return orjson.dumps(envelope, option=_DUMP_OPTIONS)
+
+
+def _unwrap(raw: Any) -> Optional[CacheEntry]:
+    if raw is None:
+        return None
+    if not isinstance(raw, bytes):
+        return CacheEntry(raw)  # 배포 직후 남아 있는 이전 형식(pickle)의 항목
+    envelope = orjson.loads(raw)
+    return CacheEntry(envelope["value"], stale=time.time() >= envelope["fresh_until"], error=envelope["error"])
+
+
+def load(key: str) -> Optional[CacheEntry]:
+    return _unwrap(cache.get(key))
+
+
+async def aload(key: str) -> Optional[CacheEntry]:
+    return _unwrap(await cache.aget(key))
+
+
+def fresh_value(entry: Optional[CacheEntry]) -> Any:
+    """Single-flight lookup helper: the fresh value, ``None`` when missing or stale, or raise for a failure."""
+    if entry is None:
+        return None
+    entry.raise_for_error()
+    return None if entry.stale else entry.value
+
+
+def store(key: str, value: Any, policy: CachePolicy, *, degraded: bool = False) -> None:
+    """Cache ``value``; a ``degraded`` (fallback) value is only kept for ``negative_ttl`` and never served stale."""
+    if degraded:
+        if policy.ttl and policy.negative_ttl:
+            cache.set(key, _wrap(value, policy.negative_ttl), timeout=policy.negative_ttl)
+        return
+    if policy.ttl:
+        cache.set(key, _wrap(value, policy.ttl), timeout=policy.ttl + policy.stale_ttl)
+
+
+async def astore(key: str, value: Any, policy: CachePolicy) -> None:
+    if policy.ttl:
+        await cache.aset(key, _wrap(value, policy.ttl), timeout=policy.ttl + policy.stale_ttl)
+
+
+def store_failure(key: str, policy: CachePolicy, exc: BaseException) -> None:
+    if policy.negative_ttl:
+        cache.set(key, _wrap(None, policy.negative_ttl, error=type(exc).__name__), timeout=policy.negative_ttl)
+
+
+async def astore_failure(key: str, policy: CachePolicy, exc: BaseException) -> None:
+    if policy.negative_ttl:
+        await cache.aset(key, _wrap(None, policy.negative_ttl, error=type(exc).__name__), timeout=policy.negative_ttl)
+
+
+def _refresh_lock_key(key: str) -> str:
+    return f"{key}:revalidate"
+
+
+def _lock_timeout() -> int:
+    return max(1, int(getattr(settings, "AI_SINGLE_FLIGHT_TIMEOUT", 60.0)))
+
+
+def _start_refresh(key: str, refresh: Callable[[], Any]) -> threading.Thread:
+    def target() -> None:
+        try:
+            refresh()
+        except Exception as exc:  # pylint: disable=broad-except
+            # 실패하면 기존 항목을 그대로 두고(stale-if-error), 잠금이 만료될 때까지 다시 시도하지 않는다.
+            logger.warning("만료된 AI 캐시 갱신 실패 (%s): %s", key, exc)
+        else:
+            cache.delete(_refresh_lock_key(key))
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=target, name="ai-cache-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+def revalidate(key: str, refresh: Callable[[], Any]) -> Optional[threading.Thread]:
+    """Run ``refresh`` (which must store the new value) in a background thread unless one is already running."""
+    if not cache.add(_refresh_lock_key(key), 1, timeout=_lock_timeout()):
+        return None
+    return _start_refresh(key, refresh)
+
+
+async def arevalidate(key: str, refresh: Callable[[], Any]) -> Optional[threading.Thread]:
+    if not await cache.aadd(_refresh_lock_key(key), 1, timeout=_lock_timeout()):
+        return None
+    # 스레드에서 동기 경로로 갱신한다. WSGI 의 async 뷰는 응답 후 이벤트 루프가 닫히므로 태스크를 쓸 수 없다.
+    return _start_refresh(key, refresh)
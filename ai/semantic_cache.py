@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from django.conf import settings
+
+from .metrics import SEMANTIC_CACHE_REQUESTS
+
+
+class SemanticResponseCache:
+    """In-process LRU of responses keyed by query embedding.
+
+    Entries live in fixed slots of a preallocated matrix so a lookup is a
+    single masked matrix-vector product. A lookup only considers entries of
+    the same ``scope`` (model, temperature, history, ...) and returns the most
+    similar unexpired response when its cosine similarity reaches
+    ``threshold``. Query vectors must be L2-normalized. Responses are kept as
+    orjson bytes, so each hit decodes a fresh copy.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        threshold: float,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._slot_scope = np.full(max_entries, -1, dtype=np.int64)
+        self._slot_expires = np.zeros(max_entries, dtype=np.float64)
+        # scope 별 id 와 그 scope 를 쓰는 슬롯 수. 슬롯이 모두 밀려난 scope 는 지워 크기가 max_entries 를 넘지 않는다.
+        self._scope_ids: Dict[str, int] = {}
+        self._scope_refs: Dict[str, int] = {}
+        self._slot_scope_key: List[Optional[str]] = [None] * max_entries
+        self._next_scope_id = 0
+        self._responses: "OrderedDict[int, bytes]" = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self.hits = 0
+        self.misses = 0
+
+    def _acquire_scope(self, slot: int, scope: str) -> int:
+        scope_id = self._scope_ids.get(scope)
+        if scope_id is None:
+            scope_id = self._scope_ids[scope] = self._next_scope_id
+            self._next_scope_id += 1
+        self._scope_refs[scope] = self._scope_refs.get(scope, 0) + 1
+        self._slot_scope_key[slot] = scope
+        return scope_id
+
+    def _release_scope(self, slot: int) -> None:
+        scope = self._slot_scope_key[slot]
+        if scope is None:
+            return
+        self._slot_scope_key[slot] = None
+        self._slot_scope[slot] = -1
+        remaining = self._scope_refs[scope] - 1
+        if remaining:
+            self._scope_refs[scope] = remaining
+        else:
+            del self._scope_refs[scope]
+            del self._scope_ids[scope]
+
+    def _reset(self, dimension: int) -> None:
+        self._vectors = np.zeros((self.max_entries, dimension), dtype=np.float32)
+        self._slot_scope.fill(-1)
+        self._scope_ids.clear()
+        self._scope_refs.clear()
+        self._slot_scope_key = [None] * self.max_entries
+        self._responses.clear()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+    def get(self, scope: str, vector: np.ndarray) -> Optional[Tuple[Any, float]]:
+        """Return ``(response, similarity)`` for the closest cached query, or ``None``."""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            scope_id = self._scope_ids.get(scope)
+            rows = np.empty(0, dtype=np.int64)
+            if scope_id is not None and self._vectors is not None and self._vectors.shape[1] == vector.shape[0]:
+                rows = np.flatnonzero((self._slot_scope == scope_id) & (self._slot_expires > self._clock()))
+            if rows.size:
+                scores = self._vectors[rows] @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    slot = int(rows[best])
+                    self._responses.move_to_end(slot)
+                    self.hits += 1
+                    SEMANTIC_CACHE_REQUESTS.labels(result="hit").inc()
+                    return orjson.loads(self._responses[slot]), float(scores[best])
+            self.misses += 1
+            SEMANTIC_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+    def set(self, scope: str, vector: np.ndarray, response: Any) -> None:
+        vector = np.asarray(vector, dtype=np.float32)
+        payload = orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                # 임베딩 모델이 바뀌면 기존 벡터와 비교할 수 없으므로 비운다.
+                self._reset(vector.shape[0])
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot, _ = self._responses.popitem(last=False)
+                self._release_scope(slot)
+            self._vectors[slot] = vector
+            self._slot_scope[slot] = self._acquire_scope(slot, scope)
+            self._slot_expires[slot] = self._clock() + self.ttl
+            self._responses[slot] = payload
+            self._responses.move_to_end(slot)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._responses), "hits": self.hits, "misses": self.misses}
+
+
+_semantic_cache: Optional[SemanticResponseCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_response_cache() -> Optional[SemanticResponseCache]:
+    """Return the process-wide chat semantic cache, or ``None`` when it is disabled."""
+    global _semantic_cache  # noqa: PLW0603
+    size = getattr(settings, "AI_CHAT_SEMANTIC_CACHE_SIZE", 0)
+    ttl = getattr(settings, "AI_CHAT_CACHE_TTL", 300)
+    if size <= 0 or not ttl:
+        return None
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticResponseCache(
+                max_entries=size,
+                threshold=getattr(settings, "AI_CHAT_SEMANTIC_CACHE_THRESHOLD", 0.95),
+                ttl=ttl,
+            )
+        return _semantic_cache
@@ -12,6 +12,7 @@ class ChatRequestSerializer(serializers.Serializer):
     message = serializers.CharField()
     history = ChatMessageSerializer(many=True, required=False)
     temperature = serializers.FloatField(required=False, min_value=0.0, max_value=2.0)
+    stream = serializers.BooleanField(required=False, default=False)
 
     def validate_history(self, value):
         filtered = []
@@ -5,30 +5,30 @@ import json
 import logging
 import re
 import textwrap
-from copy import deepcopy
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
 from decouple import config
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Q
 from django.core.cache import cache
-from PIL import Image
+from django.core.exceptions import ImproperlyConfigured
 from langchain_core.messages import AIMessage, HumanMessage, BaseMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import Runnable
 from bs4 import BeautifulSoup
-from langchain_openai import ChatOpenAI
-
+from .corpus import TagCatalog, get_certificate_corpus, get_tag_catalog
+from .keyword_matcher import compile_keyword_matcher
+from .llm import get_chat_model
+from .metrics import OCR_CACHE_REQUESTS
+from .ocr_pool import OcrError, get_ocr_pool, pytesseract
 from .rag import RagHit, get_certificate_rag_retriever
-try:
-    import pytesseract
-    from pytesseract import TesseractNotFoundError, TesseractError
-except ImportError:  # pragma: no cover - optional dependency
-    pytesseract = None  # type: ignore[assignment]
-    TesseractNotFoundError = TesseractError = RuntimeError  # type: ignore[assignment]
+from . import response_cache
+from .response_cache import CachePolicy
+from .semantic_cache import get_semantic_response_cache
+from .singleflight import single_flight
 
 JOB_TEXT_HINTS = [
     "주요업무",
@@ -94,7 +94,7 @@ def _build_cache_key(prefix: str, *parts: object) -> str:
         hasher.update(b"|")
     return f"skillbridge:{prefix}:{hasher.hexdigest()}"
 
-from certificates.models import Certificate, Tag
+from certificates.models import Certificate
 
 
 ASSISTANT_SYSTEM_PROMPT = textwrap.dedent(
@@ -212,6 +212,7 @@ DEFAULT_JOB_FETCH_HEADERS = {
     ),
     "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
 }
+IMAGE_FETCH_CONCURRENCY = 8
 
 GENERIC_STOPWORDS = {
     "및",
@@ -404,6 +405,69 @@ JOB_TITLE_PATTERN = re.compile(
 )
 
 
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _JsonStringFieldStream:
+    """Incrementally decodes one string field of a JSON object that arrives in chunks.
+
+    Used to forward ``assistant_message`` to the client while the model is
+    still producing the rest of the JSON payload.
+    """
+
+    def __init__(self, field: str):
+        self._pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._position: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        if self._done or not chunk:
+            return ""
+        self._buffer += chunk
+        if self._position is None:
+            match = self._pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._position = match.end()
+
+        buffer = self._buffer
+        index = self._position
+        decoded: List[str] = []
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self._done = True
+                index += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                index += 1
+                continue
+            if index + 1 >= len(buffer):
+                break  # 이스케이프 시퀀스가 다음 청크에서 이어진다.
+            escape = buffer[index + 1]
+            if escape != "u":
+                decoded.append(_JSON_ESCAPES.get(escape, escape))
+                index += 2
+                continue
+            # \uXXXX (서로게이트 쌍이면 \uXXXX\uXXXX) 가 모두 도착할 때까지 기다린다.
+            end = index + 6
+            if end > len(buffer):
+                break
+            if buffer[index + 2 : index + 4].lower() in ("d8", "d9", "da", "db"):
+                end = index + 12
+                if end > len(buffer):
+                    break
+            try:
+                decoded.append(json.loads(f'"{buffer[index:end]}"'))
+            except json.JSONDecodeError:
+                pass
+            index = end
+        self._position = index
+        return "".join(decoded)
+
+
 def _map_history(history: List[Dict[str, str]]) -> List[BaseMessage]:
     mapped: List[BaseMessage] = []
     for item in history:
@@ -416,6 +480,51 @@ def _map_history(history: List[Dict[str, str]]) -> List[BaseMessage]:
     return mapped
 
 
+@dataclass
+class _ChatTurn:
+    """One chat request and the cache coordinates resolved for it."""
+
+    message: str
+    history: List[Dict[str, str]]
+    temperature: float
+    cache_key: str
+    semantic_scope: Optional[str] = None
+    query_vector: object = None
+
+    @classmethod
+    def create(
+        cls, model: str, message: str, history: Optional[List[Dict[str, str]]], temperature: float
+    ) -> "_ChatTurn":
+        history = history or []
+        cache_key = _build_cache_key("chat", model, temperature, message, history)
+        return cls(message=message, history=history, temperature=temperature, cache_key=cache_key)
+
+
+class _ReplyAssembler:
+    """Collects streamed chunks and decodes the ``assistant_message`` text as it arrives."""
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._field = _JsonStringFieldStream("assistant_message")
+
+    def feed(self, chunk: object) -> str:
+        content = getattr(chunk, "content", chunk)
+        if not isinstance(content, str):
+            return ""
+        self._chunks.append(content)
+        return self._field.feed(content)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+
+def _replay_reply(response: Dict[str, object]) -> List[Tuple[str, object]]:
+    # 다른 요청이 생성한 응답을 기다린 경우 전체 답변을 토큰 이벤트 하나로 보낸다.
+    message = response.get("assistant_message")
+    return [("token", message)] if message else []
+
+
 class LangChainChatService:
     def __init__(self, prompt: Optional[ChatPromptTemplate] = None):
         api_key = config("GPT_KEY", default=None)
@@ -426,15 +535,11 @@ class LangChainChatService:
         self.prompt = prompt or CHAT_RESPONSE_PROMPT
         self.api_key = api_key
         self.retriever = get_certificate_rag_retriever()
-        self.cache_timeout = getattr(settings, "AI_CHAT_CACHE_TTL", 300)
+        self.cache_policy = CachePolicy.for_route("chat", ttl=300, stale_ttl=600, negative_ttl=30)
+        self.semantic_cache = get_semantic_response_cache()
 
     def _build_chain(self, temperature: float) -> Runnable:
-        llm = ChatOpenAI(
-            api_key=self.api_key,
-            model=self.model,
-            temperature=temperature,
-            model_kwargs={"response_format": {"type": "json_object"}},
-        )
+        llm = get_chat_model(api_key=self.api_key, model=self.model, temperature=temperature, json_mode=True)
         return self.prompt | llm
 
     @staticmethod
@@ -459,22 +564,206 @@ class LangChainChatService:
         history: Optional[List[Dict[str, str]]] = None,
         temperature: float = 0.3,
     ) -> Dict[str, object]:
-        history = history or []
-        cache_key = _build_cache_key("chat", self.model, temperature, message, history)
-        cached_response = cache.get(cache_key)
-        if cached_response is not None:
-            return deepcopy(cached_response)
-
-        context_text, context_hits = self._build_context(message)
-        chain = self._build_chain(temperature)
-        result = chain.invoke(
-            {
-                "history": _map_history(history),
-                "input": message,
-                "context": context_text,
-            }
+        turn = _ChatTurn.create(self.model, message, history, temperature)
+        cached = self._lookup(turn)
+        if cached is not None:
+            return cached
+        # 같은 질문이 동시에 들어오면 LLM 호출은 한 번만 하고 나머지는 결과를 기다린다.
+        return single_flight.do(turn.cache_key, lambda: self._compute_response(turn), lambda: self._fresh(turn))
+
+    async def arun(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 0.3,
+    ) -> Dict[str, object]:
+        """Async variant of :meth:`run` for the ASGI chat view."""
+        turn = _ChatTurn.create(self.model, message, history, temperature)
+        cached = await self._alookup(turn)
+        if cached is not None:
+            return cached
+        return await single_flight.ado(
+            turn.cache_key, lambda: self._acompute_response(turn), lambda: self._afresh(turn)
+        )
+
+    def stream(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 0.3,
+    ) -> Iterator[Tuple[str, object]]:
+        """Sync variant of :meth:`astream` for WSGI, where an async iterator would be buffered."""
+        turn = _ChatTurn.create(self.model, message, history, temperature)
+        cached = self._lookup(turn)
+        if cached is not None:
+            yield ("result", cached)
+            return
+        yield from single_flight.stream(
+            turn.cache_key, lambda: self._stream_response(turn), lambda: self._fresh(turn), _replay_reply
+        )
+
+    async def astream(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 0.3,
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """Yield ``("token", text)`` pieces of ``assistant_message`` and finally ``("result", response)``.
+
+        A cached response is replayed as a single ``result`` item. Identical
+        requests arriving while one is being generated wait for it and receive
+        the whole message as one ``token`` item.
+        """
+        turn = _ChatTurn.create(self.model, message, history, temperature)
+        cached = await self._alookup(turn)
+        if cached is not None:
+            yield ("result", cached)
+            return
+        async for item in single_flight.astream(
+            turn.cache_key, lambda: self._astream_response(turn), lambda: self._afresh(turn), _replay_reply
+        ):
+            yield item
+
+    def _lookup(self, turn: "_ChatTurn") -> Optional[Dict[str, object]]:
+        """Return the exact or semantic cache hit for ``turn``, refreshing a stale entry in the background."""
+        entry = response_cache.load(turn.cache_key)
+        if entry is not None:
+            entry.raise_for_error()
+            if entry.stale:
+                response_cache.revalidate(turn.cache_key, lambda: self._compute_response(turn, revalidating=True))
+            return entry.value
+
+        turn.semantic_scope = self._semantic_scope(turn.message, turn.history, turn.temperature)
+        turn.query_vector = self.retriever.embed_query(turn.message) if turn.semantic_scope else None
+        return self._semantic_get(turn.semantic_scope, turn.query_vector)
+
+    async def _alookup(self, turn: "_ChatTurn") -> Optional[Dict[str, object]]:
+        entry = await response_cache.aload(turn.cache_key)
+        if entry is not None:
+            entry.raise_for_error()
+            if entry.stale:
+                await response_cache.arevalidate(
+                    turn.cache_key, lambda: self._compute_response(turn, revalidating=True)
+                )
+            return entry.value
+
+        turn.semantic_scope = self._semantic_scope(turn.message, turn.history, turn.temperature)
+        turn.query_vector = await self.retriever.aembed_query(turn.message) if turn.semantic_scope else None
+        return self._semantic_get(turn.semantic_scope, turn.query_vector)
+
+    @staticmethod
+    def _fresh(turn: "_ChatTurn") -> Optional[Dict[str, object]]:
+        return response_cache.fresh_value(response_cache.load(turn.cache_key))
+
+    @staticmethod
+    async def _afresh(turn: "_ChatTurn") -> Optional[Dict[str, object]]:
+        return response_cache.fresh_value(await response_cache.aload(turn.cache_key))
+
+    def _remember(self, turn: "_ChatTurn", response: Dict[str, object]) -> None:
+        response_cache.store(turn.cache_key, response, self.cache_policy)
+        self._semantic_set(turn.semantic_scope, turn.query_vector, response)
+
+    async def _aremember(self, turn: "_ChatTurn", response: Dict[str, object]) -> None:
+        await response_cache.astore(turn.cache_key, response, self.cache_policy)
+        self._semantic_set(turn.semantic_scope, turn.query_vector, response)
+
+    @staticmethod
+    def _chain_inputs(turn: "_ChatTurn", context_text: str) -> Dict[str, object]:
+        return {"history": _map_history(turn.history), "input": turn.message, "context": context_text}
+
+    def _compute_response(self, turn: "_ChatTurn", *, revalidating: bool = False) -> Dict[str, object]:
+        try:
+            context_text, context_hits = self._build_context(turn.message)
+            result = self._build_chain(turn.temperature).invoke(self._chain_inputs(turn, context_text))
+            response = self._build_response(result, context_hits)
+        except ImproperlyConfigured:
+            raise
+        except Exception as exc:
+            # 백그라운드 갱신이 실패하면 아직 쓸 수 있는 이전 응답을 그대로 둔다(stale-if-error).
+            if not revalidating:
+                response_cache.store_failure(turn.cache_key, self.cache_policy, exc)
+            raise
+        self._remember(turn, response)
+        return response
+
+    async def _acompute_response(self, turn: "_ChatTurn") -> Dict[str, object]:
+        try:
+            context_text, context_hits = await self._abuild_context(turn.message)
+            result = await self._build_chain(turn.temperature).ainvoke(self._chain_inputs(turn, context_text))
+            response = self._build_response(result, context_hits)
+        except ImproperlyConfigured:
+            raise
+        except Exception as exc:
+            await response_cache.astore_failure(turn.cache_key, self.cache_policy, exc)
+            raise
+        await self._aremember(turn, response)
+        return response
+
+    def _stream_response(self, turn: "_ChatTurn") -> Iterator[Tuple[str, object]]:
+        try:
+            context_text, context_hits = self._build_context(turn.message)
+            reply = _ReplyAssembler()
+            for chunk in self._build_chain(turn.temperature).stream(self._chain_inputs(turn, context_text)):
+                delta = reply.feed(chunk)
+                if delta:
+                    yield ("token", delta)
+            response = self._build_response(reply.text, context_hits)
+        except ImproperlyConfigured:
+            raise
+        except Exception as exc:
+            response_cache.store_failure(turn.cache_key, self.cache_policy, exc)
+            raise
+        self._remember(turn, response)
+        yield ("result", response)
+
+    async def _astream_response(self, turn: "_ChatTurn") -> AsyncIterator[Tuple[str, object]]:
+        try:
+            context_text, context_hits = await self._abuild_context(turn.message)
+            reply = _ReplyAssembler()
+            async for chunk in self._build_chain(turn.temperature).astream(self._chain_inputs(turn, context_text)):
+                delta = reply.feed(chunk)
+                if delta:
+                    yield ("token", delta)
+            response = self._build_response(reply.text, context_hits)
+        except ImproperlyConfigured:
+            raise
+        except Exception as exc:
+            await response_cache.astore_failure(turn.cache_key, self.cache_policy, exc)
+            raise
+        await self._aremember(turn, response)
+        yield ("result", response)
+
+    def _semantic_scope(self, message: str, history: List[Dict[str, str]], temperature: float) -> Optional[str]:
+        """Return the semantic cache scope for this turn, or ``None`` when it should not be used.
+
+        The certificate names mentioned in ``message`` are part of the scope, so
+        a question about 정보처리기사 never reuses an answer about 정보처리산업기사
+        however close the two embeddings are.
+        """
+        if self.semantic_cache is None or self.retriever is None:
+            return None
+        if len(history) > getattr(settings, "AI_CHAT_SEMANTIC_CACHE_MAX_HISTORY", 2):
+            return None
+        certificates = list(self.retriever.mentioned_certificates(message))
+        return _build_cache_key(
+            "chat-semantic", self.model, temperature, self.retriever.model_name, history, certificates
         )
 
+    def _semantic_get(self, scope: Optional[str], query_vector) -> Optional[Dict[str, object]]:
+        if scope is None or query_vector is None:
+            return None
+        hit = self.semantic_cache.get(scope, query_vector)
+        if hit is None:
+            return None
+        response, similarity = hit
+        logger.debug("의미 기반 캐시 적중 (유사도 %.3f)", similarity)
+        return response
+
+    def _semantic_set(self, scope: Optional[str], query_vector, response: Dict[str, object]) -> None:
+        if scope is not None and query_vector is not None:
+            self.semantic_cache.set(scope, query_vector, response)
+
+    def _build_response(self, result: object, context_hits: List[RagHit]) -> Dict[str, object]:
         if isinstance(result, AIMessage):
             content = result.content
         elif isinstance(result, str):
@@ -510,10 +799,6 @@ class LangChainChatService:
                 }
                 for hit in context_hits
             ]
-
-        if self.cache_timeout:
-            cache.set(cache_key, deepcopy(response), timeout=self.cache_timeout)
-
         return response
 
     def _parse_assistant_json(self, raw: str) -> Dict[str, object]:
@@ -549,7 +834,20 @@ class LangChainChatService:
         except Exception as exc:  # pragma: no cover - safeguards
             logger.warning("RAG 검색 실패: %s", exc)
             return ("컨텍스트 없음", [])
+        return self._format_context(hits)
+
+    async def _abuild_context(self, message: str) -> Tuple[str, List[RagHit]]:
+        if not self.retriever:
+            return ("컨텍스트 없음", [])
+        try:
+            hits = await self.retriever.asearch(message, top_k=4)
+        except Exception as exc:  # pragma: no cover - safeguards
+            logger.warning("RAG 검색 실패: %s", exc)
+            return ("컨텍스트 없음", [])
+        return self._format_context(hits)
 
+    @staticmethod
+    def _format_context(hits: List[RagHit]) -> Tuple[str, List[RagHit]]:
         if not hits:
             return ("컨텍스트 없음", [])
 
@@ -654,11 +952,11 @@ class JobRecommendationLLMClient:
             raise ImproperlyConfigured("GPT_KEY 환경 변수가 설정되지 않았습니다.")
 
         model_name = config("GPT_MODEL", default="gpt-4o-mini")
-        self._chain = self.RECOMMEND_PROMPT | ChatOpenAI(
+        self._chain = self.RECOMMEND_PROMPT | get_chat_model(
             api_key=api_key,
             model=model_name,
             temperature=0.2,
-            model_kwargs={"response_format": {"type": "json_object"}},
+            json_mode=True,
         )
 
     def recommend(self, job_text: str, max_results: int) -> Dict[str, object]:
@@ -690,40 +988,67 @@ class JobRecommendationLLMClient:
 logger = logging.getLogger(__name__)
 
 
-class OcrError(Exception):
-    """이미지에서 텍스트 추출 중 발생한 오류."""
-
-
 class OCRService:
     def __init__(self, *, default_lang: str = "kor+eng"):
         self.default_lang = default_lang
+        self.cache_timeout = getattr(settings, "AI_OCR_CACHE_TTL", 604800)
 
-    def extract_text(self, image_file, *, lang: str | None = None) -> str:
+    def _select_lang(self, lang: str | None) -> str:
         if pytesseract is None:
             raise OcrError("pytesseract 라이브러리가 설치되어 있지 않습니다. requirements.txt를 확인하세요.")
+        return (lang or self.default_lang or "").strip() or "kor+eng"
+
+    @staticmethod
+    def _cache_key(image_bytes: bytes, lang: str) -> str:
+        # 같은 이미지(바이트)와 언어 설정이면 결과가 같으므로 내용 해시로 캐시한다.
+        return _build_cache_key("ocr", lang, hashlib.sha256(image_bytes).hexdigest())
 
-        selected_lang = (lang or self.default_lang or "").strip() or "kor+eng"
+    def extract_text(self, image_file, *, lang: str | None = None) -> str:
+        selected_lang = self._select_lang(lang)
 
         try:
             if hasattr(image_file, "seek"):
                 image_file.seek(0)
-            image = Image.open(image_file)
+            image_bytes = image_file.read()
         except Exception as exc:
             raise OcrError(f"이미지를 열 수 없습니다: {exc}") from exc
 
-        try:
-            if image.mode not in ("L", "RGB"):
-                image = image.convert("RGB")
-
-            text = pytesseract.image_to_string(image, lang=selected_lang)
-        except TesseractNotFoundError as exc:  # pragma: no cover
-            raise OcrError("Tesseract OCR 실행 파일을 찾을 수 없습니다. 서버에 tesseract-ocr을 설치하세요.") from exc
-        except TesseractError as exc:  # pragma: no cover
-            raise OcrError(f"OCR 처리 중 오류가 발생했습니다: {exc}") from exc
-        finally:
-            image.close()
+        cache_key = self._cache_key(image_bytes, selected_lang) if self.cache_timeout else None
+        if cache_key:
+            cached = cache.get(cache_key)
+            OCR_CACHE_REQUESTS.labels(result="miss" if cached is None else "hit").inc()
+            if cached is not None:
+                return cached
+
+        # tesseract 는 OCR 작업자 프로세스에서 실행된다.
+        text = get_ocr_pool().extract(image_bytes, selected_lang)
+        if cache_key:
+            cache.set(cache_key, text, timeout=self.cache_timeout)
+        return text
 
-        return text.strip()
+    def extract_many(self, images: List[bytes], *, lang: str | None = None) -> List[Optional[str]]:
+        """OCR several images in parallel; failed images yield ``None``."""
+        selected_lang = self._select_lang(lang)
+        if not self.cache_timeout:
+            return get_ocr_pool().extract_many(images, selected_lang)
+
+        keys = [self._cache_key(image_bytes, selected_lang) for image_bytes in images]
+        cached = cache.get_many(keys)
+        missing = [index for index, key in enumerate(keys) if key not in cached]
+        OCR_CACHE_REQUESTS.labels(result="hit").inc(len(keys) - len(missing))
+        OCR_CACHE_REQUESTS.labels(result="miss").inc(len(missing))
+
+        texts: List[Optional[str]] = [cached.get(key) for key in keys]
+        fresh: Dict[str, str] = {}
+        if missing:
+            results = get_ocr_pool().extract_many([images[index] for index in missing], selected_lang)
+            for index, text in zip(missing, results):
+                texts[index] = text
+                if text is not None:
+                    fresh[keys[index]] = text
+        if fresh:
+            cache.set_many(fresh, timeout=self.cache_timeout)
+        return texts
 
 
 class JobKeywordExtractor:
@@ -732,7 +1057,7 @@ class JobKeywordExtractor:
         if not api_key:
             raise ImproperlyConfigured("GPT_KEY 환경 변수가 설정되지 않았습니다.")
         model = config("GPT_MODEL", default="gpt-4o-mini")
-        self.llm = ChatOpenAI(api_key=api_key, model=model, temperature=0.2)
+        self.llm = get_chat_model(api_key=api_key, model=model, temperature=0.2)
         self.prompt = JOB_ANALYSIS_PROMPT
 
     def extract(self, job_text: str, tag_catalog: List[str]) -> Dict[str, object]:
@@ -818,8 +1143,8 @@ class JobCertificateRecommendationService:
     def __init__(self, max_job_chars: int = 6000):
         self.max_job_chars = max_job_chars
         self._keyword_extractor: Optional[JobKeywordExtractor] = None
-        self._tag_lookup: Optional[Dict[str, str]] = None
-        self.job_analysis_cache_timeout = getattr(settings, "AI_JOB_ANALYSIS_CACHE_TTL", 900)
+        self._tag_catalog: Optional[TagCatalog] = None
+        self.job_analysis_cache_policy = CachePolicy.for_route("job_analysis", ttl=900, stale_ttl=1800, negative_ttl=60)
 
     def recommend(
         self,
@@ -830,14 +1155,16 @@ class JobCertificateRecommendationService:
         job_text = self._resolve_job_text(image, provided_content)
         summary = textwrap.shorten(job_text, width=400, placeholder="...")
 
-        # 레거시 LLM 추천기와의 호환성 유지 (환경 설정 검증 목적)
-        try:
-            JobRecommendationLLMClient()
-        except ImproperlyConfigured as exc:
-            raise JobContentFetchError(str(exc)) from exc
-        except JobRecommendationError:
-            # 실제 추천에는 사용하지 않으므로 오류만 기록
-            logger.debug("JobRecommendationLLMClient 호출을 건너뜁니다.", exc_info=True)
+        # 설정 검증은 기동 시 시스템 체크(ai.checks)에서 수행한다.
+        # 레거시 LLM 추천기 검증은 AI_LEGACY_RECOMMENDER_ENABLED 가 켜진 경우에만 유지한다.
+        if getattr(settings, "AI_LEGACY_RECOMMENDER_ENABLED", False):
+            try:
+                JobRecommendationLLMClient()
+            except ImproperlyConfigured as exc:
+                raise JobContentFetchError(str(exc)) from exc
+            except JobRecommendationError:
+                # 실제 추천에는 사용하지 않으므로 오류만 기록
+                logger.debug("JobRecommendationLLMClient 호출을 건너뜁니다.", exc_info=True)
 
         if not self._has_meaningful_content(job_text):
             return {
@@ -851,7 +1178,7 @@ class JobCertificateRecommendationService:
 
         analysis, keyword_suggestions = self._extract_job_analysis(job_text)
         scored, missing_keywords, matched_keywords = self._score_certificates(job_text, analysis)
-        top = scored[:max_results]
+        top = self._attach_certificates(scored[:max_results])
 
         notice: Optional[str] = None
         if not top:
@@ -868,6 +1195,22 @@ class JobCertificateRecommendationService:
             "keyword_suggestions": keyword_suggestions,
         }
 
+    @staticmethod
+    def _attach_certificates(candidates: List[Dict[str, object]]) -> List[Dict[str, object]]:
+        """Replace corpus entries with ``Certificate`` instances (one PK lookup) for serialization."""
+        if not candidates:
+            return []
+        instances = Certificate.objects.prefetch_related("tags").in_bulk(
+            [item["certificate"].id for item in candidates]
+        )
+        attached: List[Dict[str, object]] = []
+        for item in candidates:
+            certificate = instances.get(item["certificate"].id)
+            if certificate is None:
+                continue  # 스냅샷 이후 삭제된 자격증
+            attached.append({**item, "certificate": certificate})
+        return attached
+
     def _resolve_job_text(self, image_file, provided_content: Optional[str]) -> str:
         content = (provided_content or "").strip()
         if content:
@@ -995,11 +1338,9 @@ class JobCertificateRecommendationService:
 
     def _extract_text_from_images(self, html: str, base_url: str) -> str:
         soup = BeautifulSoup(html, "html.parser")
-        image_urls: List[str] = []
+        sources: List[object] = []  # 페이지 순서대로 이미지 바이트 또는 내려받을 URL
         seen = set()
 
-        ocr_service = OCRService()
-
         for img in soup.find_all("img"):
             src = img.get("data-src") or img.get("src")
             if not src:
@@ -1012,44 +1353,46 @@ class JobCertificateRecommendationService:
             if src.startswith("data:image"):
                 try:
                     header, data = src.split(",", 1)
-                    image_bytes = base64.b64decode(data)
+                    sources.append(base64.b64decode(data))
                 except Exception:
                     continue
-                try:
-                    text = ocr_service.extract_text(io.BytesIO(image_bytes), lang=None)
-                except OcrError:
-                    continue
-                if text:
-                    image_urls.append(text)
                 continue
 
             full_url = urljoin(base_url, src)
-            image_urls.append(full_url)
+            if full_url.startswith("http"):
+                sources.append(full_url)
 
-        ocr_texts: List[str] = []
+        if not sources:
+            return ""
 
-        for entry in image_urls:
-            if entry.startswith("http"):
-                try:
-                    image_response = requests.get(entry, headers=DEFAULT_JOB_FETCH_HEADERS, timeout=10)
-                    image_response.raise_for_status()
-                except requests.RequestException:
-                    continue
-                content_type = image_response.headers.get("Content-Type", "")
-                if "image" not in content_type:
-                    continue
-                try:
-                    text = ocr_service.extract_text(io.BytesIO(image_response.content), lang=None)
-                except OcrError:
-                    continue
-            else:
-                text = entry
+        # 이미지는 병렬로 내려받고, OCR 도 작업자 풀에서 한꺼번에 처리한다.
+        urls = [source for source in sources if isinstance(source, str)]
+        with ThreadPoolExecutor(max_workers=min(IMAGE_FETCH_CONCURRENCY, len(urls) or 1)) as pool:
+            downloaded = dict(zip(urls, pool.map(self._download_image, urls)))
+        images = [downloaded.get(source) if isinstance(source, str) else source for source in sources]
+        images = [image for image in images if image]
+        if not images:
+            return ""
 
-            if text and len(text.strip()) >= 6:
-                ocr_texts.append(text.strip())
+        try:
+            texts = OCRService().extract_many(images, lang=None)
+        except OcrError:
+            return ""
 
+        ocr_texts = [text.strip() for text in texts if text and len(text.strip()) >= 6]
         return "\n".join(ocr_texts)
 
+    @staticmethod
+    def _download_image(url: str) -> Optional[bytes]:
+        try:
+            image_response = requests.get(url, headers=DEFAULT_JOB_FETCH_HEADERS, timeout=10)
+            image_response.raise_for_status()
+        except requests.RequestException:
+            return None
+        content_type = image_response.headers.get("Content-Type", "")
+        if "image" not in content_type:
+            return None
+        return image_response.content
 
     def _strip_html(self, html: str) -> str:
         soup = BeautifulSoup(html, "html.parser")
@@ -1122,17 +1465,33 @@ class JobCertificateRecommendationService:
         return snippet
 
     def _extract_job_analysis(self, job_text: str) -> tuple[Optional[Dict[str, object]], List[str]]:
-        gpt_analysis: Optional[Dict[str, object]] = None
-
-        tag_lookup = self._get_tag_lookup()
-        tag_catalog = sorted(set(tag_lookup.values()))
-        cache_key = _build_cache_key("job-analysis", job_text, tag_catalog)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            cached_analysis = cached.get("analysis") or {}
-            cached_suggestions = cached.get("suggestions") or []
-            return deepcopy(cached_analysis), list(cached_suggestions)
+        catalog = self._get_tag_catalog()
+        tag_catalog = list(catalog.names)
+        # 태그 목록 전체 대신 버전 토큰으로 키를 만든다. 태그가 바뀌면 토큰도 바뀐다.
+        cache_key = _build_cache_key("job-analysis", job_text, catalog.version)
+        entry = response_cache.load(cache_key)
+        if entry is not None and entry.error is None:
+            cached = entry.value
+            if entry.stale:
+                response_cache.revalidate(
+                    cache_key,
+                    lambda: self._compute_job_analysis(job_text, tag_catalog, cache_key, revalidating=True),
+                )
+        else:
+            # 같은 공고를 동시에 분석하는 요청은 한 번만 LLM 을 호출한다.
+            cached = single_flight.do(
+                cache_key,
+                lambda: self._compute_job_analysis(job_text, tag_catalog, cache_key),
+                lambda: response_cache.fresh_value(response_cache.load(cache_key)),
+            )
+        # 캐시 항목은 읽을 때마다 새로 디코딩되므로 복사 없이 그대로 돌려준다.
+        return cached.get("analysis") or {}, cached.get("suggestions") or []
 
+    def _compute_job_analysis(
+        self, job_text: str, tag_catalog: List[str], cache_key: str, *, revalidating: bool = False
+    ) -> Dict[str, object]:
+        gpt_analysis: Optional[Dict[str, object]] = None
+        extraction_failed = False
         try:
             extractor = self._get_keyword_extractor()
         except ImproperlyConfigured:
@@ -1142,8 +1501,10 @@ class JobCertificateRecommendationService:
                 gpt_analysis = extractor.extract(job_text, tag_catalog)
             except JobKeywordExtractionError as exc:
                 logger.warning("핵심 키워드 추출 실패: %s", exc)
+                extraction_failed = True
             except Exception as exc:  # pylint: disable=broad-except
                 logger.warning("핵심 키워드 추출 중 예기치 못한 오류: %s", exc)
+                extraction_failed = True
 
         fallback = self._fallback_job_analysis(job_text)
         merged = self._merge_analysis(gpt_analysis, fallback)
@@ -1171,17 +1532,13 @@ class JobCertificateRecommendationService:
         add_suggestions(filtered.get("preferred_skills", []))
         add_suggestions(filtered.get("new_keywords", []))
 
-        if self.job_analysis_cache_timeout:
-            cache.set(
-                cache_key,
-                {
-                    "analysis": deepcopy(filtered),
-                    "suggestions": list(suggestions),
-                },
-                timeout=self.job_analysis_cache_timeout,
-            )
+        result = {"analysis": filtered, "suggestions": suggestions}
+        # LLM 이 실패해 규칙 기반 결과만 있으면 짧게만 저장해 곧 다시 시도한다.
+        # 백그라운드 갱신 중이라면 기존의 (만료된) 정상 결과를 덮어쓰지 않는다.
+        if not (revalidating and extraction_failed):
+            response_cache.store(cache_key, result, self.job_analysis_cache_policy, degraded=extraction_failed)
 
-        return filtered, suggestions
+        return result
 
     def _get_keyword_extractor(self) -> JobKeywordExtractor:
         if self._keyword_extractor is None:
@@ -1391,14 +1748,14 @@ class JobCertificateRecommendationService:
             return None
         return text
 
+    def _get_tag_catalog(self) -> TagCatalog:
+        # 한 요청 안에서는 같은 스냅샷을 쓴다.
+        if self._tag_catalog is None:
+            self._tag_catalog = get_tag_catalog()
+        return self._tag_catalog
+
     def _get_tag_lookup(self) -> Dict[str, str]:
-        if self._tag_lookup is None:
-            self._tag_lookup = {
-                name.casefold(): name
-                for name in Tag.objects.values_list("name", flat=True)
-                if isinstance(name, str) and name.strip()
-            }
-        return self._tag_lookup
+        return self._get_tag_catalog().lookup
 
     def _match_tag(self, keyword: str) -> Optional[str]:
         lookup = self._get_tag_lookup()
@@ -1541,77 +1898,37 @@ class JobCertificateRecommendationService:
         if not normalized_keywords and not loose_keywords:
             return [], sorted(missing_keywords, key=str.casefold), []
 
-        keyword_filter = Q()
-        for original in normalized_keywords.values():
-            term = original.strip()
-            if not term:
-                continue
-            keyword_filter |= (
-                Q(name__icontains=term)
-                | Q(tags__name__icontains=term)
-                | Q(overview__icontains=term)
-                | Q(job_roles__icontains=term)
-                | Q(exam_method__icontains=term)
-                | Q(eligibility__icontains=term)
-                | Q(type__icontains=term)
-            )
-        for original in loose_keywords.values():
-            term = original.strip()
-            if not term:
-                continue
-            keyword_filter |= (
-                Q(name__icontains=term)
-                | Q(overview__icontains=term)
-                | Q(job_roles__icontains=term)
-                | Q(exam_method__icontains=term)
-                | Q(eligibility__icontains=term)
-                | Q(type__icontains=term)
-            )
-
-        queryset = Certificate.objects.all().prefetch_related("tags")
-        if keyword_filter.children:
-            queryset = queryset.filter(keyword_filter).distinct()
-
         candidates: List[Dict[str, object]] = []
 
         job_title_lower = job_title.casefold() if isinstance(job_title, str) else ""
 
-        for certificate in queryset:
-            name_lower = (certificate.name or "").lower()
-            field_blob = " ".join(
-                [
-                    certificate.overview or "",
-                    certificate.job_roles or "",
-                    certificate.exam_method or "",
-                    certificate.eligibility or "",
-                    certificate.type or "",
-                ]
-            ).lower()
-
-            tag_names = [tag.name for tag in certificate.tags.all() if tag.name]
-            tag_lowers = [tag.lower() for tag in tag_names]
-
-            matched_name_keywords: set[str] = set()
-            matched_field_keywords: set[str] = set()
+        # 키워드 집합마다 한 번만 컴파일해 인증서 텍스트를 한 번씩만 훑는다.
+        matcher = compile_keyword_matcher(frozenset(normalized_keywords) | frozenset(loose_keywords))
+
+        # DB 대신 프로세스 메모리의 자격증 스냅샷을 대상으로 점수를 매긴다.
+        for certificate in get_certificate_corpus().certificates:
+            name_lower = certificate.name_lower
+            name_hits = matcher.find(name_lower)
+            field_hits = matcher.find(certificate.field_blob)
+
+            matched_name_keywords = {original for lower_kw, original in normalized_keywords.items() if lower_kw in name_hits}
+            matched_field_keywords = {
+                original
+                for lower_kw, original in normalized_keywords.items()
+                if lower_kw in field_hits and lower_kw not in name_hits
+            }
+            matched_loose_keywords = {
+                original for lower_kw, original in loose_keywords.items() if lower_kw in name_hits or lower_kw in field_hits
+            }
+
+            # 키워드마다 그것을 포함하는 첫 번째 태그만 인정한다.
             matched_tags: set[str] = set()
-            matched_loose_keywords: set[str] = set()
-
-            for lower_kw, original_kw in normalized_keywords.items():
-                if lower_kw in name_lower:
-                    matched_name_keywords.add(original_kw)
-                elif lower_kw in field_blob:
-                    matched_field_keywords.add(original_kw)
-
-                for idx, tag_lower in enumerate(tag_lowers):
-                    if not tag_lower:
-                        continue
-                    if lower_kw == tag_lower or lower_kw in tag_lower:
-                        matched_tags.add(tag_names[idx])
-                        break
-
-            for lower_kw, original_kw in loose_keywords.items():
-                if lower_kw in name_lower or lower_kw in field_blob:
-                    matched_loose_keywords.add(original_kw)
+            tagged_keywords: set[str] = set()
+            for tag_name in certificate.tag_names:
+                tag_hits = {lower_kw for lower_kw in matcher.find(tag_name.lower()) if lower_kw in normalized_keywords}
+                if tag_hits - tagged_keywords:
+                    matched_tags.add(tag_name)
+                    tagged_keywords |= tag_hits
 
             score = 0
             job_title_match = bool(job_title_lower and job_title_lower in name_lower)
@@ -0,0 +1,355 @@
+"""Single-flight de-duplication of identical in-flight AI computations.
+
+When many requests miss the cache for the same key at once, only one of them
+(the leader) computes the value; the others wait for its result instead of
+issuing duplicate LLM calls. Within a process the in-flight calls are a map of
+``concurrent.futures.Future`` shared by threads and by every event loop (under
+WSGI each async view runs on its own loop), so plain, async and streaming
+requests for the same key all coalesce. With ``REDIS_URL`` set, the leader
+also holds a short lock in the shared cache (``cache.add`` is ``SET NX`` on
+Redis), and workers in other processes poll the cache for the leader's result.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from copy import deepcopy
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import SINGLE_FLIGHT_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 스트리밍 계산은 ``(kind, payload)`` 쌍을 내보내고 마지막에 ``("result", value)`` 를 낸다.
+StreamItem = Tuple[str, Any]
+RESULT = "result"
+
+
+class SingleFlight:
+    """Coalesces concurrent computations that share a cache key.
+
+    ``lookup`` returns the cached value (or ``None``); it is re-checked by the
+    leader and polled by followers in other processes. ``compute`` must store
+    its result in the cache so those followers can see it. Followers in the
+    same process receive a deep copy of the leader's value, or its exception.
+    """
+
+    def __init__(
+        self,
+        *,
+        wait_timeout: Optional[float] = None,
+        poll_interval: float = 0.05,
+        distributed: Optional[bool] = None,
+    ):
+        self._wait_timeout = wait_timeout
+        self._poll_interval = poll_interval
+        self._distributed = distributed
+        self._lock = threading.Lock()
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+
+    @property
+    def wait_timeout(self) -> float:
+        if self._wait_timeout is not None:
+            return self._wait_timeout
+        return getattr(settings, "AI_SINGLE_FLIGHT_TIMEOUT", 60.0)
+
+    @property
+    def distributed(self) -> bool:
+        if self._distributed is not None:
+            return self._distributed
+        return bool(getattr(settings, "REDIS_URL", ""))
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{key}:single-flight"
+
+    def _claim(self, key: str) -> Tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                SINGLE_FLIGHT_REQUESTS.labels(result="coalesced").inc()
+                return future, False
+            future = self._futures[key] = concurrent.futures.Future()
+        SINGLE_FLIGHT_REQUESTS.labels(result="leader").inc()
+        return future, True
+
+    def _settle(
+        self,
+        key: str,
+        future: concurrent.futures.Future,
+        value: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        # 대기자가 깨어나 다시 시도할 때 끝난 future 를 보지 않도록 먼저 맵에서 뺀다.
+        with self._lock:
+            self._futures.pop(key, None)
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            future.cancel()  # 선행 요청이 취소되면 대기자는 직접 계산한다.
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _wait(self, key: str, future: concurrent.futures.Future) -> Optional[Any]:
+        """Return a copy of the leader's value (or raise its error); ``None`` if it timed out or was cancelled."""
+        try:
+            return deepcopy(future.result(timeout=self.wait_timeout))
+        except concurrent.futures.TimeoutError:
+            logger.warning("동일 요청 대기 시간 초과로 직접 계산합니다: %s", key)
+        except concurrent.futures.CancelledError:
+            pass
+        return None
+
+    async def _await(self, key: str, future: concurrent.futures.Future) -> Optional[Any]:
+        try:
+            # shield 로 감싸 대기 시간 초과가 선행 요청의 future 를 취소하지 않게 한다.
+            value = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.wait_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("동일 요청 대기 시간 초과로 직접 계산합니다: %s", key)
+            return None
+        except (asyncio.CancelledError, concurrent.futures.CancelledError):
+            if not future.cancelled():
+                raise
+            return None
+        return deepcopy(value)
+
+    def _poll(self, lock_key: str, lookup: Callable[[], Optional[T]]) -> Optional[T]:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self._poll_interval)
+            value = lookup()
+            if value is not None:
+                return value
+            if cache.get(lock_key) is None:
+                break  # 다른 프로세스의 계산이 실패했거나 캐시에 저장하지 않았다.
+        return None
+
+    async def _apoll(self, lock_key: str, lookup: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self._poll_interval)
+            value = await lookup()
+            if value is not None:
+                return value
+            if await cache.aget(lock_key) is None:
+                break
+        return None
+
+    def do(self, key: str, compute: Callable[[], T], lookup: Callable[[], Optional[T]]) -> T:
+        future, leader = self._claim(key)
+        if not leader:
+            value = self._wait(key, future)
+            if value is not None:
+                return value
+            if future.cancelled():
+                return self.do(key, compute, lookup)
+            return compute()
+
+        try:
+            value = self._lead(key, compute, lookup)
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    def _lead(self, key: str, compute: Callable[[], T], lookup: Callable[[], Optional[T]]) -> T:
+        value = lookup()
+        if value is not None:
+            return value
+        if not self.distributed:
+            return compute()
+
+        lock_key = self._lock_key(key)
+        if cache.add(lock_key, 1, timeout=max(1, int(self.wait_timeout))):
+            try:
+                return compute()
+            finally:
+                cache.delete(lock_key)
+        value = self._poll(lock_key, lookup)
+        return value if value is not None else compute()
+
+    async def ado(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        lookup: Callable[[], Awaitable[Optional[T]]],
+    ) -> T:
+        future, leader = self._claim(key)
+        if not leader:
+            value = await self._await(key, future)
+            if value is not None:
+                return value
+            if future.cancelled():
+                return await self.ado(key, compute, lookup)
+            return await compute()
+
+        try:
+            value = await self._alead(key, compute, lookup)
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    async def _alead(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        lookup: Callable[[], Awaitable[Optional[T]]],
+    ) -> T:
+        value = await lookup()
+        if value is not None:
+            return value
+        if not self.distributed:
+            return await compute()
+
+        lock_key = self._lock_key(key)
+        if await cache.aadd(lock_key, 1, timeout=max(1, int(self.wait_timeout))):
+            try:
+                return await compute()
+            finally:
+                await cache.adelete(lock_key)
+        value = await self._apoll(lock_key, lookup)
+        return value if value is not None else await compute()
+
+    def stream(
+        self,
+        key: str,
+        compute: Callable[[], Iterator[StreamItem]],
+        lookup: Callable[[], Optional[T]],
+        replay: Callable[[T], Iterable[StreamItem]],
+    ) -> Iterator[StreamItem]:
+        """Streaming variant of :meth:`do`.
+
+        ``compute`` yields ``(kind, payload)`` items ending with ``("result",
+        value)``; the leader passes them through as they arrive. Everyone who
+        gets the value some other way (a follower, or a leader whose lookup
+        hit) yields ``replay(value)`` and then the ``("result", value)`` item.
+        """
+        future, leader = self._claim(key)
+        if not leader:
+            value = self._wait(key, future)
+            if value is None and future.cancelled():
+                yield from self.stream(key, compute, lookup, replay)
+                return
+            yield from (self._replay(value, replay) if value is not None else compute())
+            return
+
+        try:
+            value = yield from self._lead_stream(key, compute, lookup, replay)
+        except BaseException as exc:  # 클라이언트 연결이 끊기면 GeneratorExit
+            self._settle(key, future, error=exc)
+            raise
+        self._settle(key, future, value)
+
+    def _lead_stream(
+        self,
+        key: str,
+        compute: Callable[[], Iterator[StreamItem]],
+        lookup: Callable[[], Optional[T]],
+        replay: Callable[[T], Iterable[StreamItem]],
+    ) -> Generator[StreamItem, None, Optional[T]]:
+        value = lookup()
+        if value is None and self.distributed:
+            lock_key = self._lock_key(key)
+            if cache.add(lock_key, 1, timeout=max(1, int(self.wait_timeout))):
+                try:
+                    return (yield from self._pass_through(compute()))
+                finally:
+                    cache.delete(lock_key)
+            value = self._poll(lock_key, lookup)
+        if value is None:
+            return (yield from self._pass_through(compute()))
+        yield from self._replay(value, replay)
+        return value
+
+    @staticmethod
+    def _pass_through(items: Iterable[StreamItem]) -> Generator[StreamItem, None, Optional[Any]]:
+        value = None
+        for kind, payload in items:
+            if kind == RESULT:
+                value = payload
+            yield (kind, payload)
+        return value
+
+    @staticmethod
+    def _replay(value: Any, replay: Callable[[Any], Iterable[StreamItem]]) -> Iterator[StreamItem]:
+        yield from replay(value)
+        yield (RESULT, value)
+
+    async def astream(
+        self,
+        key: str,
+        compute: Callable[[], AsyncIterator[StreamItem]],
+        lookup: Callable[[], Awaitable[Optional[T]]],
+        replay: Callable[[T], Iterable[StreamItem]],
+    ) -> AsyncIterator[StreamItem]:
+        """Async variant of :meth:`stream`."""
+        future, leader = self._claim(key)
+        if not leader:
+            value = await self._await(key, future)
+            if value is None and future.cancelled():
+                async for item in self.astream(key, compute, lookup, replay):
+                    yield item
+                return
+            if value is not None:
+                for item in self._replay(value, replay):
+                    yield item
+            else:
+                async for item in compute():
+                    yield item
+            return
+
+        value = None
+        try:
+            value = await lookup()
+            streamed = False
+            if value is None and self.distributed:
+                lock_key = self._lock_key(key)
+                if await cache.aadd(lock_key, 1, timeout=max(1, int(self.wait_timeout))):
+                    streamed = True
+                    try:
+                        async for kind, payload in compute():
+                            if kind == RESULT:
+                                value = payload
+                            yield (kind, payload)
+                    finally:
+                        await cache.adelete(lock_key)
+                else:
+                    value = await self._apoll(lock_key, lookup)
+            if not streamed:
+                if value is None:
+                    async for kind, payload in compute():
+                        if kind == RESULT:
+                            value = payload
+                        yield (kind, payload)
+                else:
+                    for item in self._replay(value, replay):
+                        yield item
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self._settle(key, future, value)
+
+
+single_flight = SingleFlight()
@@ -1,17 +1,67 @@
+import argparse
+import asyncio
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from langchain_core.messages import AIMessage, AIMessageChunk
+import numpy as np
 from PIL import Image
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from ai.checks import check_ai_configuration, validate_ai_configuration
+from ai.corpus import CORPUS_VERSION_KEY, TAG_CATALOG_VERSION_KEY, SnapshotStore, build_corpus, build_tag_catalog
+from ai.keyword_matcher import KeywordMatcher
+from ai import llm
+from ai.llm import get_chat_model
+from ai.ocr_pool import OcrError, OcrPool, run_ocr
 from ai.models import JobTagContribution
-from ai.services import JobContentFetchError
-from certificates.models import Certificate, Tag
+from ai import response_cache
+from ai.response_cache import UpstreamUnavailableError
+from ai.rag import (
+    CertificateRagRetriever,
+    HashingNgramEmbedder,
+    IvfIndex,
+    LexicalIndex,
+    QueryEmbeddingCache,
+    RagRetrieverError,
+    RetrieverRegistry,
+    embedder_sidecar_path,
+    ivf_sidecar_path,
+    metadata_sidecar_path,
+    save_binary_index,
+)
+from ai.semantic_cache import SemanticResponseCache
+from ai.services import JobContentFetchError, LangChainChatService, OCRService, _build_cache_key
+from ai.singleflight import SingleFlight, single_flight
+from certificates.models import Certificate, CertificateTag, Tag
+from scripts import build_rag_documents, build_rag_index
+
+
+def _parse_sse_events(body):
+    return [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in body.decode("utf-8").strip().split("\n\n")
+    ]
+
+
+def _read_sse_events(response):
+    return _parse_sse_events(b"".join(response.streaming_content))
 
 
 class ChatViewTests(APITestCase):
@@ -27,15 +77,18 @@ class ChatViewTests(APITestCase):
     @patch("ai.views.LangChainChatService")
     def test_chat_success(self, mock_service_cls):
         mock_service = mock_service_cls.return_value
-        mock_service.run.return_value = {
-            "assistant_message": "안녕하세요!",
-            "intent": "general_question",
-            "needs_admin": False,
-            "admin_summary": "",
-            "out_of_scope": False,
-            "confidence": 0.8,
-            "context_hits": [],
-        }
+        # WSGI 요청은 공유 동기 클라이언트를 쓰도록 run 으로 처리된다.
+        mock_service.run = MagicMock(
+            return_value={
+                "assistant_message": "안녕하세요!",
+                "intent": "general_question",
+                "needs_admin": False,
+                "admin_summary": "",
+                "out_of_scope": False,
+                "confidence": 0.8,
+                "context_hits": [],
+            }
+        )
 
         url = reverse("ai-chat")
         payload = {
@@ -52,6 +105,70 @@ class ChatViewTests(APITestCase):
         metadata = response.data["metadata"]
         self.assertFalse(metadata["needs_admin"])
         self.assertEqual(metadata["intent"], "general_question")
+        mock_service.arun.assert_not_called()
+
+    @patch("ai.views.LangChainChatService")
+    async def test_chat_awaits_service_under_asgi(self, mock_service_cls):
+        mock_service = mock_service_cls.return_value
+        mock_service.arun = AsyncMock(return_value={"assistant_message": "비동기 응답", "intent": "general_question"})
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.post(
+            reverse("ai-chat"), {"message": "안녕"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["reply"], "비동기 응답")
+        mock_service.run.assert_not_called()
+
+    STREAM_ITEMS = [
+        ("token", "안녕"),
+        ("token", "하세요!"),
+        ("result", {"assistant_message": "안녕하세요!", "intent": "general_question", "confidence": 0.8}),
+    ]
+
+    def _assert_streamed_reply(self, response, events):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/event-stream"))
+        self.assertEqual([name for name, _ in events], ["token", "token", "done"])
+        self.assertEqual("".join(data["delta"] for name, data in events if name == "token"), "안녕하세요!")
+        self.assertEqual(events[-1][1]["reply"], "안녕하세요!")
+        self.assertEqual(events[-1][1]["metadata"]["intent"], "general_question")
+
+    @patch("ai.views.LangChainChatService")
+    def test_chat_stream_sends_tokens_then_done_event(self, mock_service_cls):
+        # 테스트 클라이언트는 WSGI 요청이므로 버퍼링되지 않는 동기 스트림을 사용한다.
+        mock_service_cls.return_value.stream = lambda **kwargs: iter(self.STREAM_ITEMS)
+
+        url = reverse("ai-chat")
+        response = self.client.post(url, {"message": "안녕", "stream": True}, format="json")
+
+        self.assertFalse(response.is_async)
+        self._assert_streamed_reply(response, _read_sse_events(response))
+
+    @patch("ai.views.LangChainChatService")
+    async def test_chat_stream_uses_async_iterator_under_asgi(self, mock_service_cls):
+        async def fake_stream(**kwargs):
+            for item in self.STREAM_ITEMS:
+                yield item
+
+        mock_service_cls.return_value.astream = fake_stream
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.post(
+            reverse("ai-chat"), {"message": "안녕", "stream": True}, content_type="application/json"
+        )
+
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self._assert_streamed_reply(response, _parse_sse_events(body))
+
+    def test_chat_rejects_blank_message(self):
+        url = reverse("ai-chat")
+        response = self.client.post(url, {"message": "   "}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("message", response.data)
 
     def test_chat_requires_authentication(self):
         self.client.force_authenticate(user=None)
@@ -62,7 +179,7 @@ class ChatViewTests(APITestCase):
     @patch("ai.views.LangChainChatService")
     def test_ai_error_returns_fallback_response(self, mock_service_cls):
         mock_service = mock_service_cls.return_value
-        mock_service.run.side_effect = RuntimeError("boom")
+        mock_service.run = MagicMock(side_effect=RuntimeError("boom"))
 
         url = reverse("ai-chat")
         response = self.client.post(url, {"message": "help"}, format="json")
@@ -72,6 +189,288 @@ class ChatViewTests(APITestCase):
         self.assertEqual(response.data["metadata"]["error"], "unavailable")
 
 
+class LangChainChatServiceStreamTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_astream_decodes_message_and_replays_cache_as_single_result(self, _config, _retriever):
+        payload = json.dumps({"assistant_message": "줄\n바꿈 \"인용\"", "intent": "general_question"})
+        chain = MagicMock()
+
+        async def fake_astream(_inputs):
+            for start in range(0, len(payload), 3):
+                yield AIMessageChunk(content=payload[start : start + 3])
+
+        chain.astream = fake_astream
+        service = LangChainChatService()
+
+        async def collect():
+            return [item async for item in service.astream("안녕")]
+
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            first = async_to_sync(collect)()
+            second = async_to_sync(collect)()
+
+        tokens = "".join(value for kind, value in first if kind == "token")
+        self.assertEqual(tokens, "줄\n바꿈 \"인용\"")
+        self.assertEqual(first[-1], ("result", second[0][1]))
+        self.assertEqual(len(second), 1)
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_stream_yields_tokens_synchronously(self, _config, _retriever):
+        payload = json.dumps({"assistant_message": "동기 스트림", "intent": "general_question"})
+        chain = MagicMock()
+        chain.stream.return_value = iter(AIMessageChunk(content=payload[start : start + 4]) for start in range(0, len(payload), 4))
+
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            items = list(LangChainChatService().stream("안녕"))
+
+        self.assertEqual("".join(value for kind, value in items if kind == "token"), "동기 스트림")
+        self.assertEqual(items[-1][1]["assistant_message"], "동기 스트림")
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_concurrent_streams_share_one_llm_call(self, _config, _retriever):
+        payload = json.dumps({"assistant_message": "한 번만 생성", "intent": "general_question"})
+        follower_waiting = threading.Event()
+        chain = MagicMock()
+
+        def fake_stream(_inputs):
+            yield AIMessageChunk(content=payload[:20])
+            follower_waiting.wait(5)
+            yield AIMessageChunk(content=payload[20:])
+
+        chain.stream.side_effect = fake_stream
+        claim = single_flight._claim
+
+        def tracking_claim(key):
+            future, leader = claim(key)
+            if not leader:
+                follower_waiting.set()
+            return future, leader
+
+        service = LangChainChatService()
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain), patch.object(
+            single_flight, "_claim", side_effect=tracking_claim
+        ), ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(lambda: list(service.stream("안녕")))
+            time.sleep(0.05)
+            follower = pool.submit(lambda: list(service.stream("안녕")))
+            leader_items, follower_items = leader.result(5), follower.result(5)
+
+        self.assertEqual(chain.stream.call_count, 1)
+        self.assertEqual("".join(value for kind, value in leader_items if kind == "token"), "한 번만 생성")
+        self.assertEqual(follower_items, [("token", "한 번만 생성"), ("result", leader_items[-1][1])])
+
+
+class SemanticResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = SemanticResponseCache(max_entries=2, threshold=0.9, ttl=60, clock=lambda: self.now)
+
+    @staticmethod
+    def _unit(values):
+        vector = np.asarray(values, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def test_returns_similar_response_within_scope(self):
+        self.cache.set("scope", self._unit([1.0, 0.0, 0.0]), {"assistant_message": "난이도는 중상입니다."})
+
+        hit = self.cache.get("scope", self._unit([1.0, 0.2, 0.0]))
+
+        self.assertEqual(hit[0]["assistant_message"], "난이도는 중상입니다.")
+        self.assertGreater(hit[1], 0.9)
+        self.assertIsNone(self.cache.get("scope", self._unit([0.0, 1.0, 0.0])))
+        self.assertIsNone(self.cache.get("other-scope", self._unit([1.0, 0.0, 0.0])))
+        self.assertEqual(self.cache.stats(), {"entries": 1, "hits": 1, "misses": 2})
+
+    def test_evicts_least_recently_used_and_expired_entries(self):
+        self.cache.set("scope", self._unit([1.0, 0.0, 0.0]), "a")
+        self.cache.set("scope", self._unit([0.0, 1.0, 0.0]), "b")
+        self.cache.get("scope", self._unit([1.0, 0.0, 0.0]))
+        self.cache.set("scope", self._unit([0.0, 0.0, 1.0]), "c")
+
+        self.assertEqual(self.cache.get("scope", self._unit([1.0, 0.0, 0.0]))[0], "a")
+        self.assertIsNone(self.cache.get("scope", self._unit([0.0, 1.0, 0.0])))
+
+        self.now = 61.0
+        self.assertIsNone(self.cache.get("scope", self._unit([1.0, 0.0, 0.0])))
+
+    def test_scopes_are_forgotten_once_their_entries_are_evicted(self):
+        for turn in range(10):
+            self.cache.set(f"history-{turn}", self._unit([1.0, float(turn), 0.0]), turn)
+
+        self.assertEqual(sorted(self.cache._scope_ids), ["history-8", "history-9"])
+        self.assertEqual(self.cache.get("history-9", self._unit([1.0, 9.0, 0.0]))[0], 9)
+        self.assertIsNone(self.cache.get("history-0", self._unit([1.0, 0.0, 0.0])))
+
+
+class LangChainChatServiceSemanticCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("ai.services.get_certificate_rag_retriever")
+    @patch("ai.services.config", return_value="test-key")
+    def test_paraphrased_question_reuses_cached_answer(self, _config, mock_get_retriever):
+        vectors = {
+            "정보처리기사 난이도?": np.array([1.0, 0.0], dtype=np.float32),
+            "정보처리기사 어려워요?": np.array([0.99, 0.141], dtype=np.float32),
+        }
+        retriever = mock_get_retriever.return_value
+        retriever.model_name = "test-embedding"
+        retriever.embed_query.side_effect = vectors.get
+        retriever.search.return_value = []
+        retriever.mentioned_certificates.return_value = ("정보처리기사",)
+        chain = MagicMock()
+        chain.invoke.return_value = AIMessage(content=json.dumps({"assistant_message": "중상 난이도입니다."}))
+
+        service = LangChainChatService()
+        service.semantic_cache = SemanticResponseCache(max_entries=8, threshold=0.95, ttl=60)
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            first = service.run("정보처리기사 난이도?")
+            second = service.run("정보처리기사 어려워요?")
+
+        self.assertEqual(chain.invoke.call_count, 1)
+        self.assertEqual(second["assistant_message"], first["assistant_message"])
+
+    @patch("ai.services.get_certificate_rag_retriever")
+    @patch("ai.services.config", return_value="test-key")
+    def test_near_duplicate_certificate_names_do_not_share_answers(self, _config, mock_get_retriever):
+        documents = [
+            {"id": "certificate_profile:1", "name": "정보처리기사", "text": "정보처리기사 자격증 정보"},
+            {"id": "certificate_profile:2", "name": "정보처리산업기사", "text": "정보처리산업기사 자격증 정보"},
+        ]
+        embedder = MagicMock()
+        # 해시 n-gram 임베딩처럼 두 질문의 벡터가 사실상 같아도 다른 자격증의 답을 재사용하면 안 된다.
+        embedder.embed_query.return_value = [1.0, 0.0]
+        retriever = CertificateRagRetriever(
+            documents=documents,
+            embeddings=np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+            embedding_client=embedder,
+            model_name="test-embedding",
+        )
+        mock_get_retriever.return_value = retriever
+        chain = MagicMock()
+        chain.invoke.side_effect = [
+            AIMessage(content=json.dumps({"assistant_message": "기사 답변"})),
+            AIMessage(content=json.dumps({"assistant_message": "산업기사 답변"})),
+        ]
+
+        service = LangChainChatService()
+        service.semantic_cache = SemanticResponseCache(max_entries=8, threshold=0.95, ttl=60)
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            first = service.run("정보처리기사 난이도?")
+            second = service.run("정보처리산업기사 난이도?")
+
+        self.assertEqual(retriever.mentioned_certificates("정보처리산업기사 난이도?"), ("정보처리산업기사",))
+        self.assertEqual(chain.invoke.call_count, 2)
+        self.assertEqual(first["assistant_message"], "기사 답변")
+        self.assertEqual(second["assistant_message"], "산업기사 답변")
+
+
+class LangChainChatServiceResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_stale_response_is_served_while_refreshing_in_background(self, _config, _retriever):
+        release = threading.Event()
+        chain = MagicMock()
+
+        def invoke(_inputs):
+            if chain.invoke.call_count > 1:
+                release.wait(5)  # 백그라운드 갱신이 끝나기 전의 요청은 이전 답변을 받아야 한다.
+            return AIMessage(content=json.dumps({"assistant_message": "새 답변"}))
+
+        chain.invoke.side_effect = invoke
+        service = LangChainChatService()
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            service.run("정보처리기사 난이도?")
+            cache_key = _build_cache_key("chat", service.model, 0.3, "정보처리기사 난이도?", [])
+            cache.set(cache_key, response_cache._wrap({"assistant_message": "이전 답변"}, fresh_for=-1))
+
+            refreshes = []
+            start_refresh = response_cache._start_refresh
+            with patch(
+                "ai.response_cache._start_refresh",
+                side_effect=lambda *args: refreshes.append(start_refresh(*args)) or refreshes[-1],
+            ):
+                stale = service.run("정보처리기사 난이도?")
+                again = service.run("정보처리기사 난이도?")
+            release.set()
+            for thread in refreshes:
+                thread.join(5)
+            fresh = service.run("정보처리기사 난이도?")
+
+        self.assertEqual(stale["assistant_message"], "이전 답변")
+        self.assertEqual(again["assistant_message"], "이전 답변")
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(fresh["assistant_message"], "새 답변")
+        self.assertEqual(chain.invoke.call_count, 2)
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_cached_response_is_stored_as_bytes_and_decoded_per_hit(self, _config, _retriever):
+        chain = MagicMock()
+        chain.invoke.return_value = AIMessage(content=json.dumps({"assistant_message": "답변"}))
+        service = LangChainChatService()
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            first = service.run("안녕")
+            first["assistant_message"] = "변경됨"
+            second = service.run("안녕")
+            second["assistant_message"] = "또 변경됨"
+            third = service.run("안녕")
+
+        self.assertIsInstance(cache.get(_build_cache_key("chat", service.model, 0.3, "안녕", [])), bytes)
+        self.assertEqual(third["assistant_message"], "답변")
+        self.assertEqual(chain.invoke.call_count, 1)
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_failed_revalidation_keeps_serving_stale_response(self, _config, _retriever):
+        chain = MagicMock()
+        chain.invoke.side_effect = RuntimeError("upstream down")
+        service = LangChainChatService()
+        cache_key = _build_cache_key("chat", service.model, 0.3, "안녕", [])
+        cache.set(cache_key, response_cache._wrap({"assistant_message": "이전 답변"}, fresh_for=-1), timeout=60)
+
+        refreshes = []
+        start_refresh = response_cache._start_refresh
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain), patch(
+            "ai.response_cache._start_refresh",
+            side_effect=lambda *args: refreshes.append(start_refresh(*args)) or refreshes[-1],
+        ):
+            first = service.run("안녕")
+            for thread in refreshes:
+                thread.join(5)
+            second = service.run("안녕")
+
+        self.assertEqual(chain.invoke.call_count, 1)
+        self.assertEqual(first["assistant_message"], "이전 답변")
+        self.assertEqual(second["assistant_message"], "이전 답변")
+
+    @patch("ai.services.get_certificate_rag_retriever", return_value=None)
+    @patch("ai.services.config", return_value="test-key")
+    def test_failure_is_negatively_cached(self, _config, _retriever):
+        chain = MagicMock()
+        chain.invoke.side_effect = RuntimeError("upstream down")
+        service = LangChainChatService()
+        with patch.object(LangChainChatService, "_build_chain", return_value=chain):
+            with self.assertRaises(RuntimeError):
+                service.run("안녕")
+            with self.assertRaises(UpstreamUnavailableError):
+                service.run("안녕")
+
+        self.assertEqual(chain.invoke.call_count, 1)
+
+
 class JobCertificateRecommendationViewTests(APITestCase):
     def setUp(self):
         user_model = get_user_model()
@@ -199,6 +598,19 @@ class JobCertificateRecommendationViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
         self.assertIn("detail", response.data)
 
+    def test_recommendation_skips_legacy_client_by_default(self):
+        url = reverse("ai-job-certificates")
+        payload = {
+            "content": "백엔드 개발자를 채용합니다.",
+            "max_results": 1,
+        }
+
+        response = self.client.post(url, payload, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.mock_llm_cls.assert_not_called()
+
+    @override_settings(AI_LEGACY_RECOMMENDER_ENABLED=True)
     def test_recommendation_requires_ai_key(self):
         self.mock_llm_cls.side_effect = ImproperlyConfigured("GPT_KEY 환경 변수가 설정되지 않았습니다.")
 
@@ -214,6 +626,33 @@ class JobCertificateRecommendationViewTests(APITestCase):
         self.assertIn("GPT_KEY", response.data["detail"])
 
 
+class AiSystemCheckTests(SimpleTestCase):
+    @override_settings(AI_LEGACY_RECOMMENDER_ENABLED=False)
+    @patch("ai.checks.config", return_value=None)
+    def test_missing_key_is_a_startup_warning(self, _config):
+        messages = check_ai_configuration(None)
+
+        self.assertEqual([message.id for message in messages], ["ai.W001"])
+
+    @override_settings(AI_LEGACY_RECOMMENDER_ENABLED=True)
+    @patch("ai.services.JobRecommendationLLMClient", side_effect=ImproperlyConfigured("GPT_KEY 환경 변수가 설정되지 않았습니다."))
+    def test_legacy_recommender_without_key_fails_startup(self, _client):
+        messages = check_ai_configuration(None)
+
+        self.assertEqual([message.id for message in messages], ["ai.E001"])
+
+    @override_settings(AI_LEGACY_RECOMMENDER_ENABLED=True)
+    @patch("ai.services.JobRecommendationLLMClient", side_effect=ImproperlyConfigured("GPT_KEY 환경 변수가 설정되지 않았습니다."))
+    def test_server_entrypoint_validation_raises_on_errors(self, _client):
+        with self.assertRaisesMessage(ImproperlyConfigured, "ai.E001"):
+            validate_ai_configuration()
+
+    @override_settings(AI_LEGACY_RECOMMENDER_ENABLED=False)
+    @patch("ai.checks.config", return_value=None)
+    def test_server_entrypoint_validation_ignores_warnings(self, _config):
+        validate_ai_configuration()
+
+
 class JobTagContributionViewTests(APITestCase):
     def setUp(self):
         user_model = get_user_model()
@@ -294,3 +733,712 @@ class JobTagContributionViewTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("certificate_ids", response.data)
+
+
+class CertificateRagRetrieverTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp_path = Path(tmpdir.name)
+        self.documents = [
+            {"id": "certificate_profile:1", "certificate_id": "1", "type": "certificate_profile", "name": "정보처리기사", "text": "정보처리기사 자격증 정보"},
+            {"id": "certificate_profile:2", "certificate_id": "2", "type": "certificate_profile", "name": "SQLD", "text": "SQLD 자격증 정보"},
+            {"id": "certificate_stats:1:2023", "certificate_id": "1", "type": "certificate_statistics", "name": "정보처리기사", "year": "2023", "text": "정보처리기사 통계 요약 - 2023년"},
+        ]
+        self.matrix = np.array(
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.8, 0.0, 0.6]],
+            dtype=np.float32,
+        )
+
+    def _build_retriever(self, query_vector, **kwargs):
+        embedder = MagicMock()
+        embedder.embed_query.return_value = query_vector
+        return CertificateRagRetriever(
+            documents=self.documents,
+            embeddings=kwargs.pop("embeddings", self.matrix),
+            embedding_client=embedder,
+            model_name="test-model",
+            **kwargs,
+        )
+
+    def test_search_ranks_by_cosine_similarity(self):
+        retriever = self._build_retriever([2.0, 0.0, 0.0], embeddings=self.matrix * 5)
+
+        hits = retriever.search("정보처리기사", top_k=2, min_score=0.1)
+
+        self.assertEqual([hit.metadata["id"] for hit in hits], ["certificate_profile:1", "certificate_stats:1:2023"])
+        self.assertAlmostEqual(hits[0].score, 1.0, places=5)
+        self.assertAlmostEqual(hits[1].score, 0.8, places=5)
+        self.assertNotIn("text", hits[0].metadata)
+
+    def test_search_filters_by_min_score_before_top_k(self):
+        retriever = self._build_retriever([1.0, 0.0, 0.0])
+
+        hits = retriever.search("정보처리기사", top_k=4, min_score=0.9)
+
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0].metadata["certificate_id"], "1")
+
+    def test_search_returns_empty_for_zero_query_vector(self):
+        retriever = self._build_retriever([0.0, 0.0, 0.0])
+
+        self.assertEqual(retriever.search("무의미한 질문"), [])
+
+    def test_asearch_awaits_async_embedding(self):
+        retriever = self._build_retriever([0.0, 0.0, 0.0])
+        retriever._embedder.aembed_query = AsyncMock(return_value=[0.0, 1.0, 0.0])
+
+        hits = async_to_sync(retriever.asearch)("SQLD", top_k=1)
+
+        retriever._embedder.aembed_query.assert_awaited_once_with("SQLD")
+        retriever._embedder.embed_query.assert_not_called()
+        self.assertEqual(hits[0].metadata["id"], "certificate_profile:2")
+
+    def test_search_many_embeds_all_queries_in_one_call(self):
+        retriever = self._build_retriever(None)
+        retriever._embedder.embed_documents.return_value = [[0.0, 3.0, 0.0], [1.0, 0.0, 0.0]]
+
+        results = retriever.search_many(["SQLD", "", "정보처리기사"], top_k=1, min_score=0.5)
+
+        retriever._embedder.embed_documents.assert_called_once_with(["SQLD", "정보처리기사"])
+        retriever._embedder.embed_query.assert_not_called()
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0].metadata["name"], "SQLD")
+        self.assertEqual(results[1], [])
+        self.assertEqual(results[2][0].metadata["id"], "certificate_profile:1")
+
+    def test_search_filters_by_metadata_posting_lists(self):
+        retriever = self._build_retriever([1.0, 0.0, 0.0])
+
+        stats_hits = retriever.search("합격률", min_score=0.0, filters={"certificate_id": 1, "type": "certificate_statistics"})
+        year_hits = retriever.search("합격률", min_score=-1.0, filters={"year": ["2022", "2023"]})
+        missing = retriever.search("합격률", filters={"certificate_id": "999"})
+
+        self.assertEqual([hit.metadata["id"] for hit in stats_hits], ["certificate_stats:1:2023"])
+        self.assertEqual([hit.metadata["year"] for hit in year_hits], ["2023"])
+        self.assertEqual(missing, [])
+        self.assertEqual(retriever._embedder.embed_query.call_count, 2)
+        with self.assertRaises(ValueError):
+            retriever.search("합격률", filters={"authority": "한국산업인력공단"})
+
+    def test_hybrid_search_falls_back_to_lexical_when_embedding_fails(self):
+        lexical_index = LexicalIndex.build([doc["text"] for doc in self.documents])
+        retriever = self._build_retriever(None, lexical_index=lexical_index)
+        retriever._embedder.embed_query.side_effect = RuntimeError("embedding API down")
+
+        hits = retriever.search("SQLD 시험 알려줘", top_k=2)
+
+        self.assertEqual([hit.metadata["id"] for hit in hits], ["certificate_profile:2"])
+
+    def test_hybrid_search_fuses_vector_and_lexical_rankings(self):
+        lexical_index = LexicalIndex.build([doc["text"] for doc in self.documents])
+        retriever = self._build_retriever([0.0, 1.0, 0.0], lexical_index=lexical_index)
+
+        hits = retriever.search("정보처리기사 어때", top_k=3, min_score=0.5)
+
+        self.assertCountEqual(
+            [hit.metadata["id"] for hit in hits],
+            ["certificate_profile:2", "certificate_profile:1", "certificate_stats:1:2023"],
+        )
+
+    def test_hybrid_search_keeps_cosine_score_and_reports_fused_score(self):
+        lexical_index = LexicalIndex.build([doc["text"] for doc in self.documents])
+        retriever = self._build_retriever([0.0, 1.0, 0.0], lexical_index=lexical_index)
+
+        hits = retriever.search("정보처리기사 어때", top_k=3, min_score=0.5)
+
+        scores = {hit.metadata["id"]: hit.score for hit in hits}
+        self.assertAlmostEqual(scores["certificate_profile:2"], 1.0, places=5)
+        self.assertAlmostEqual(scores["certificate_profile:1"], 0.0, places=5)
+        self.assertTrue(all(hit.fused_score is not None for hit in hits))
+        self.assertEqual([hit.fused_score for hit in hits], sorted((hit.fused_score for hit in hits), reverse=True))
+
+    def test_hybrid_search_ignores_weak_lexical_matches_for_off_topic_queries(self):
+        lexical_index = LexicalIndex.build([doc["text"] for doc in self.documents])
+        retriever = self._build_retriever([0.0, 0.0, 1.0], lexical_index=lexical_index)
+        retriever._embedder.embed_query.side_effect = RuntimeError("embedding API down")
+
+        # "정보" 바이그램 하나만 겹치는 질문은 키워드 컨텍스트를 만들지 않는다.
+        self.assertEqual(retriever.search("요즘 좋아하는 음악이나 영화 관련 정보 추천해줘 제발"), [])
+        self.assertEqual(
+            [hit.metadata["id"] for hit in retriever.search("SQLD 시험 알려줘")],
+            ["certificate_profile:2"],
+        )
+
+    def test_query_embedding_cache_skips_repeated_embedding_calls(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        query_cache = QueryEmbeddingCache(model_name="test-model", timeout=60)
+        retriever = self._build_retriever([0.0, 1.0, 0.0], query_cache=query_cache)
+
+        first = retriever.search("SQLD 난이도", min_score=0.5)
+        second = retriever.search("  SQLD   난이도 ", min_score=0.5)
+        batched = retriever.search_many(["SQLD 난이도"], min_score=0.5)
+
+        retriever._embedder.embed_query.assert_called_once()
+        retriever._embedder.embed_documents.assert_not_called()
+        self.assertEqual([hit.metadata["id"] for hit in first], [hit.metadata["id"] for hit in second])
+        self.assertEqual(batched[0][0].metadata["name"], "SQLD")
+
+    def test_ivf_search_matches_exact_search(self):
+        rng = np.random.default_rng(7)
+        matrix = rng.normal(size=(len(self.documents), 3)).astype(np.float32)
+        ivf = IvfIndex.build(matrix, n_lists=2)
+        ivf_path = ivf.save(self.tmp_path / "index.ivf.npz")
+        loaded = IvfIndex.load(ivf_path)
+
+        query = [float(value) for value in matrix[0]]
+        exact = self._build_retriever(query, embeddings=matrix)
+        approximate = self._build_retriever(query, embeddings=matrix, ivf_index=loaded, n_probe=loaded.n_lists)
+
+        self.assertEqual(sorted(loaded.rows.tolist()), [0, 1, 2])
+        self.assertEqual(
+            [hit.metadata["id"] for hit in approximate.search("q", min_score=-1.0)],
+            [hit.metadata["id"] for hit in exact.search("q", min_score=-1.0)],
+        )
+
+    @patch.dict("os.environ", {"GPT_KEY": "sk-test"})
+    def test_binary_index_round_trip_is_memory_mapped(self):
+        index_path = self.tmp_path / "index.npy"
+        save_binary_index(index_path, documents=self.documents, embeddings=self.matrix, model_name="test-model")
+
+        self.assertTrue(metadata_sidecar_path(index_path).exists())
+        retriever = CertificateRagRetriever.from_index(path=str(index_path))
+
+        self.assertEqual(retriever.model_name, "test-model")
+        self.assertIsInstance(retriever._matrix.base, np.memmap)
+        np.testing.assert_allclose(np.asarray(retriever._matrix), self.matrix)
+
+    def test_binary_index_files_follow_umask(self):
+        index_path = self.tmp_path / "index.npy"
+        previous = os.umask(0o022)
+        try:
+            save_binary_index(index_path, documents=self.documents, embeddings=self.matrix, model_name="test-model")
+        finally:
+            os.umask(previous)
+
+        for path in (index_path, metadata_sidecar_path(index_path)):
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o644)
+
+    def test_rebuilding_binary_index_removes_stale_ivf_sidecar(self):
+        index_path = self.tmp_path / "index.npy"
+        save_binary_index(index_path, documents=self.documents, embeddings=self.matrix, model_name="test-model")
+        IvfIndex.build(self.matrix, n_lists=2).save(ivf_sidecar_path(index_path))
+
+        # --ivf 없이 같은 문서 수로 다시 빌드해도 이전 IVF 인덱스가 남지 않아야 한다.
+        save_binary_index(index_path, documents=self.documents, embeddings=self.matrix[::-1], model_name="test-model")
+
+        self.assertFalse(ivf_sidecar_path(index_path).exists())
+
+    @patch.dict("os.environ", {"GPT_KEY": "sk-test"})
+    def test_legacy_json_index_is_still_readable(self):
+        index_path = self.tmp_path / "index.json"
+        payload = {
+            "model": "legacy-model",
+            "documents": [
+                dict(doc, embedding=vector.tolist())
+                for doc, vector in zip(self.documents, self.matrix)
+            ],
+        }
+        index_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+        retriever = CertificateRagRetriever.from_index(path=str(index_path))
+
+        self.assertEqual(retriever.model_name, "legacy-model")
+        self.assertNotIn("embedding", retriever._documents[0])
+        np.testing.assert_allclose(retriever._matrix, self.matrix)
+
+    @patch("ai.rag._resolve_api_key", return_value=None)
+    def test_local_embedder_index_searches_without_api_key(self, _mock_key):
+        texts = [doc["text"] for doc in self.documents]
+        embedder = HashingNgramEmbedder.fit(texts, dimension=64)
+        index_path = self.tmp_path / "index.npy"
+        save_binary_index(
+            index_path,
+            documents=self.documents,
+            embeddings=embedder.embed_documents(texts),
+            model_name=embedder.model_name,
+        )
+        embedder.save(embedder_sidecar_path(index_path))
+
+        retriever = CertificateRagRetriever.from_index(path=str(index_path))
+        hits = retriever.search("SQLD 자격증", top_k=1, min_score=0.0)
+
+        self.assertEqual(retriever.model_name, "local-hash-ngram-64")
+        self.assertEqual(hits[0].metadata["id"], "certificate_profile:2")
+
+
+class BuildRagIndexTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.checkpoint = Path(tmpdir.name) / "index.npy.checkpoint.jsonl"
+        self.items = [("a", "첫 문서"), ("b", "둘째 문서"), ("c", "셋째 문서")]
+
+    def _embed(self, embedder, **kwargs):
+        return build_rag_index.embed_concurrently(
+            embedder,
+            self.items,
+            model="test-model",
+            checkpoint=self.checkpoint,
+            concurrency=1,
+            max_items=1,
+            base_delay=0,
+            **kwargs,
+        )
+
+    def test_failed_run_checkpoints_finished_batches_and_resumes(self):
+        calls = []
+
+        def embed_documents(texts):
+            calls.extend(texts)
+            if texts == ["둘째 문서"]:
+                raise ValueError("invalid input")
+            return [[float(len(text)), 1.0] for text in texts]
+
+        failing = MagicMock()
+        failing.embed_documents.side_effect = embed_documents
+        with self.assertRaises(ValueError):
+            self._embed(failing, max_retries=3)
+
+        # 재시도할 수 없는 오류는 다시 요청하지 않는다.
+        self.assertEqual(calls[:2], ["첫 문서", "둘째 문서"])
+        self.assertEqual(calls.count("둘째 문서"), 1)
+        finished = set(calls) - {"둘째 문서"}
+
+        calls.clear()
+        healthy = MagicMock()
+        healthy.embed_documents.side_effect = lambda texts: calls.extend(texts) or [[1.0, 0.0] for _ in texts]
+        vectors = self._embed(healthy)
+
+        # 실패 전에 끝난 배치는 체크포인트에서 복구되고, 나머지만 다시 임베딩한다.
+        self.assertEqual(set(calls), {"첫 문서", "둘째 문서", "셋째 문서"} - finished)
+        self.assertEqual(sorted(vectors), ["a", "b", "c"])
+
+    def test_incremental_build_only_embeds_new_and_changed_documents(self):
+        output = self.checkpoint.parent / "index.npy"
+        previous_docs = [
+            {"id": "a", "text": "그대로인 문서"},
+            {"id": "b", "text": "수정 전 문서"},
+            {"id": "c", "text": "삭제될 문서"},
+        ]
+        previous_matrix = np.eye(3, dtype=np.float32)
+        save_binary_index(output, documents=previous_docs, embeddings=previous_matrix, model_name="test-model")
+        docs = [
+            {"id": "a", "text": "그대로인 문서"},
+            {"id": "b", "text": "수정 후 문서"},
+            {"id": "d", "text": "새 문서"},
+        ]
+        embedded = []
+
+        def fake_embeddings(**kwargs):
+            embedder = MagicMock()
+            embedder.embed_documents.side_effect = lambda texts: embedded.extend(texts) or [[0.0, 1.0, 1.0] for _ in texts]
+            return embedder
+
+        args = argparse.Namespace(
+            full=False,
+            output=output,
+            model="test-model",
+            api_key="sk-test",
+            concurrency=1,
+            batch_size=8,
+            max_batch_tokens=1000,
+            requests_per_minute=0,
+            max_retries=0,
+        )
+        with patch.object(build_rag_index, "OpenAIEmbeddings", side_effect=fake_embeddings), patch.object(
+            build_rag_index, "_token_counter", return_value=len
+        ):
+            vectors = build_rag_index._embed_with_openai(args, docs)
+
+        self.assertCountEqual(embedded, ["수정 후 문서", "새 문서"])
+        np.testing.assert_allclose(vectors[0], previous_matrix[0])
+        np.testing.assert_allclose(vectors[1], [0.0, 1.0, 1.0])
+
+    def test_incremental_build_reuses_legacy_json_index_next_to_binary_output(self):
+        output = self.checkpoint.parent / "index.npy"
+        docs = [{"id": "a", "text": "첫 문서"}, {"id": "b", "text": "둘째 문서"}]
+        build_rag_index._write_json_index(
+            output.with_suffix(".json"), docs, [np.array([1.0, 0.0]), np.array([0.0, 1.0])], "test-model"
+        )
+
+        vectors, hashes = build_rag_index._load_previous_vectors(output, "test-model")
+
+        self.assertEqual(sorted(hashes), ["a", "b"])
+        np.testing.assert_allclose(vectors[hashes["b"]], [0.0, 1.0])
+        self.assertEqual(build_rag_index._load_previous_vectors(output, "other-model"), ({}, {}))
+
+    def test_ivf_recall_does_not_count_the_query_document_itself(self):
+        angles = np.radians([0.0, 10.0, 80.0, 90.0])
+        matrix = np.stack([np.cos(angles), np.sin(angles)], axis=1).astype(np.float32)
+        ivf = IvfIndex(centroids=matrix, offsets=np.arange(5), rows=np.arange(4))
+
+        recall = build_rag_index._ivf_recall_at_k(matrix, ivf, n_probe=1, top_k=1, sample_size=4)
+        full_recall = build_rag_index._ivf_recall_at_k(matrix, ivf, n_probe=4, top_k=1, sample_size=4)
+
+        self.assertEqual(recall, 0.0)
+        self.assertEqual(full_recall, 1.0)
+
+    def test_transient_errors_are_retried(self):
+        embedder = MagicMock()
+        embedder.embed_documents.side_effect = [ConnectionError("reset"), [[1.0, 0.0]], [[0.0, 1.0]], [[1.0, 1.0]]]
+
+        vectors = self._embed(embedder, max_retries=2)
+
+        self.assertEqual(embedder.embed_documents.call_count, 4)
+        self.assertEqual(sorted(vectors), ["a", "b", "c"])
+
+
+class BuildRagDocumentsTests(SimpleTestCase):
+    def test_failed_run_keeps_previous_output(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        output = Path(tmpdir.name) / "documents.jsonl"
+        output.write_text('{"id": "old"}\n', encoding="utf-8")
+
+        def documents():
+            yield {"id": "new", "text": "첫 문서"}
+            raise ValueError("잘못된 행")
+
+        with self.assertRaises(ValueError):
+            build_rag_documents.write_documents(documents(), output)
+
+        self.assertEqual(output.read_text(encoding="utf-8"), '{"id": "old"}\n')
+        self.assertEqual([path.name for path in output.parent.iterdir()], ["documents.jsonl"])
+
+        count = build_rag_documents.write_documents([{"id": "new", "text": "첫 문서"}], output)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(json.loads(output.read_text(encoding="utf-8"))["id"], "new")
+
+
+class RetrieverRegistryTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.index_path = Path(tmpdir.name) / "index.json"
+        self.now = 0.0
+
+    def _registry(self, loader):
+        return RetrieverRegistry(
+            path=str(self.index_path),
+            loader=loader,
+            check_interval=1.0,
+            base_backoff=10.0,
+            max_backoff=60.0,
+            clock=lambda: self.now,
+        )
+
+    def _touch(self, content):
+        self.index_path.write_text(content, encoding="utf-8")
+
+    def test_swaps_retriever_when_index_changes(self):
+        release = threading.Event()
+        results = iter(["first", "second"])
+
+        def load(_path):
+            result = next(results)
+            if result == "second":
+                release.wait(5)
+            return result
+
+        loader = MagicMock(side_effect=load)
+        registry = self._registry(loader)
+        self._touch("v1")
+
+        self.assertEqual(registry.get(), "first")
+        self.now = 5.0
+        self.assertEqual(registry.get(), "first")
+        self.assertEqual(loader.call_count, 1)
+
+        self._touch("version-2")
+        self.now = 10.0
+        self.assertEqual(registry.get(), "first")  # 교체 중에는 기존 인덱스로 응답
+        release.set()
+        registry.join()
+        self.assertEqual(registry.get(), "second")
+        self.assertEqual(loader.call_count, 2)
+
+    def test_retries_failed_load_with_backoff(self):
+        loader = MagicMock(side_effect=[RagRetrieverError("missing"), "loaded"])
+        registry = self._registry(loader)
+
+        self.assertIsNone(registry.get())
+        self.now = 5.0
+        self.assertIsNone(registry.get())
+        self.assertEqual(loader.call_count, 1)
+
+        self.now = 11.0
+        registry.get()
+        registry.join()
+        self.assertEqual(registry.get(), "loaded")
+        self.assertEqual(loader.call_count, 2)
+
+
+class ChatModelRegistryTests(SimpleTestCase):
+    def test_reuses_clients_per_configuration_and_shares_http_pool(self):
+        first = get_chat_model(api_key="test-key", model="gpt-test", temperature=0.3, json_mode=True)
+        again = get_chat_model(api_key="test-key", model="gpt-test", temperature=0.3, json_mode=True)
+        warmer = get_chat_model(api_key="test-key", model="gpt-test", temperature=0.7, json_mode=True)
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, warmer)
+        self.assertIs(first.http_client, warmer.http_client)
+
+    def test_async_clients_are_scoped_to_the_event_loop(self):
+        async def resolve():
+            return get_chat_model(api_key="test-key", model="gpt-test", temperature=0.3)
+
+        in_first_loop = async_to_sync(resolve)()
+        in_second_loop = async_to_sync(resolve)()
+        sync_model = get_chat_model(api_key="test-key", model="gpt-test", temperature=0.3)
+
+        self.assertIsNotNone(in_first_loop.http_async_client)
+        self.assertIsNot(in_first_loop.http_async_client, in_second_loop.http_async_client)
+        self.assertIs(in_first_loop.http_client, sync_model.http_client)
+
+    def test_async_client_is_closed_when_its_event_loop_shuts_down(self):
+        async def resolve():
+            model = get_chat_model(api_key="test-key", model="gpt-test", temperature=0.3)
+            return model.http_async_client, model.http_async_client.is_closed
+
+        client, closed_while_running = asyncio.run(resolve())
+
+        self.assertFalse(closed_while_running)
+        self.assertTrue(client.is_closed)
+        self.assertEqual(len(llm._registry._loop_state), 0)
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def test_finds_overlapping_and_prefix_keywords_like_substring_checks(self):
+        keywords = ["java", "javascript", "script", "데이터", "빅데이터", "c++", "sql"]
+        matcher = KeywordMatcher(keywords)
+
+        for text in ["javascript 개발", "빅데이터 분석 및 c++", "데이터베이스 sql", "", "python"]:
+            self.assertEqual(matcher.find(text), {keyword for keyword in keywords if keyword in text}, text)
+
+
+class CertificateCorpusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_snapshot_is_reused_until_catalog_changes(self):
+        certificate = Certificate.objects.create(name="정보보안기사", overview="보안 관제")
+        store = SnapshotStore(CORPUS_VERSION_KEY, build_corpus)
+        first = store.get()
+
+        with self.assertNumQueries(0):
+            self.assertIs(store.get(), first)
+
+        tag = Tag.objects.create(name="보안")
+        certificate.tags.add(tag)
+        certificate.overview = "침해 대응"
+        certificate.save()
+        refreshed = store.get()
+
+        self.assertIsNot(refreshed, first)
+        self.assertEqual(refreshed.certificates[0].field_blob.split()[0], "침해")
+        self.assertEqual(refreshed.certificates[0].tag_names, ("보안",))
+
+    def test_link_edits_and_tag_renames_refresh_snapshot(self):
+        certificate = Certificate.objects.create(name="정보보안기사")
+        tag = Tag.objects.create(name="보안")
+        store = SnapshotStore(CORPUS_VERSION_KEY, build_corpus)
+        self.assertEqual(store.get().certificates[0].tag_names, ())
+
+        # 관리자 화면은 연결 모델을 직접 저장하므로 m2m_changed 가 발생하지 않는다.
+        link = CertificateTag.objects.create(certificate=certificate, tag=tag)
+        self.assertEqual(store.get().certificates[0].tag_names, ("보안",))
+
+        tag.name = "정보보안"
+        tag.save()
+        self.assertEqual(store.get().certificates[0].tag_names, ("정보보안",))
+
+        link.delete()
+        self.assertEqual(store.get().certificates[0].tag_names, ())
+
+    def test_tag_catalog_version_changes_only_with_tags(self):
+        Tag.objects.create(name="Python")
+        store = SnapshotStore(TAG_CATALOG_VERSION_KEY, build_tag_catalog)
+        first = store.get()
+
+        Certificate.objects.create(name="리눅스마스터")
+        with self.assertNumQueries(0):
+            self.assertIs(store.get(), first)
+
+        Tag.objects.create(name="SQL")
+        refreshed = store.get()
+
+        self.assertNotEqual(refreshed.version, first.version)
+        self.assertEqual(refreshed.names, ("Python", "SQL"))
+        self.assertEqual(refreshed.lookup["python"], "Python")
+
+
+class OcrPoolTests(SimpleTestCase):
+    @staticmethod
+    def _thread_pool(workers):
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def test_extract_many_runs_images_in_parallel_and_keeps_order(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_ocr(image_bytes, lang, timeout):
+            barrier.wait()  # 세 작업이 동시에 실행되지 않으면 BrokenBarrierError
+            if image_bytes == b"bad":
+                raise OcrError("이미지를 열 수 없습니다")
+            return image_bytes.decode()
+
+        pool = OcrPool(workers=3, timeout=5, executor_factory=self._thread_pool)
+        with patch("ai.ocr_pool.run_ocr", side_effect=fake_ocr):
+            texts = pool.extract_many([b"first", b"bad", b"third"], "kor+eng")
+
+        self.assertEqual(texts, ["first", None, "third"])
+
+    def test_run_ocr_reports_timeouts_separately_from_other_runtime_errors(self):
+        buffer = BytesIO()
+        Image.new("RGB", (4, 4)).save(buffer, format="PNG")
+
+        with patch("ai.ocr_pool.pytesseract.image_to_string", side_effect=RuntimeError("Tesseract process timeout")):
+            with self.assertRaisesMessage(OcrError, "시간이 초과"):
+                run_ocr(buffer.getvalue(), "kor+eng", timeout=1)
+        with patch("ai.ocr_pool.pytesseract.image_to_string", side_effect=RuntimeError("broken pipe")):
+            with self.assertRaisesMessage(OcrError, "OCR 처리 중 오류가 발생했습니다: broken pipe"):
+                run_ocr(buffer.getvalue(), "kor+eng", timeout=1)
+
+    def test_rejects_jobs_when_queue_is_full(self):
+        release = threading.Event()
+        pool = OcrPool(workers=1, max_pending=1, timeout=0.05, executor_factory=self._thread_pool)
+        self.addCleanup(release.set)
+        with patch("ai.ocr_pool.run_ocr", side_effect=lambda *args: release.wait(5) and "done"):
+            pool.submit(b"first", "eng")
+            with self.assertRaises(OcrError):
+                pool.submit(b"second", "eng")
+
+
+class OcrServiceCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("ai.services.get_ocr_pool")
+    def test_repeated_image_is_served_from_cache_per_language(self, mock_get_pool):
+        pool = mock_get_pool.return_value
+        pool.extract.side_effect = lambda image_bytes, lang: f"{lang}:{len(image_bytes)}"
+        pool.extract_many.side_effect = lambda images, lang: [f"{lang}:{len(image)}" for image in images]
+        service = OCRService()
+
+        first = service.extract_text(BytesIO(b"banner"), lang="kor")
+        second = service.extract_text(BytesIO(b"banner"), lang="kor")
+        english = service.extract_text(BytesIO(b"banner"), lang="eng")
+        many = service.extract_many([b"banner", b"poster"], lang="kor")
+
+        self.assertEqual(first, second)
+        self.assertEqual(english, "eng:6")
+        self.assertEqual(pool.extract.call_count, 2)
+        self.assertEqual(many, ["kor:6", "kor:6"])
+        pool.extract_many.assert_called_once_with([b"poster"], "kor")
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight(wait_timeout=5, distributed=False)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"answer": 42}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", compute, lambda: None)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do("key", compute, lambda: None)))
+            for _ in range(3)
+        ]
+        for thread in followers:
+            thread.start()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"answer": 42}] * 4)
+
+    def test_async_callers_share_one_computation(self):
+        flight = SingleFlight(wait_timeout=5, distributed=False)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"answer": 42}
+
+        async def lookup():
+            return None
+
+        async def run_all():
+            return await asyncio.gather(*(flight.ado("key", compute, lookup) for _ in range(5)))
+
+        results = async_to_sync(run_all)()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"answer": 42}] * 5)
+
+    def test_async_callers_on_separate_event_loops_share_one_computation(self):
+        # WSGI 에서는 async 뷰마다 자기 이벤트 루프를 가진 스레드에서 실행된다.
+        flight = SingleFlight(wait_timeout=5, distributed=False)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            started.set()
+            await asyncio.to_thread(release.wait, 5)
+            return {"answer": 42}
+
+        async def lookup():
+            return None
+
+        results = []
+
+        def run():
+            results.append(asyncio.run(flight.ado("key", compute, lookup)))
+
+        leader = threading.Thread(target=run)
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=run) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"answer": 42}] * 5)
+
+    def test_waits_for_result_computed_by_another_process(self):
+        flight = SingleFlight(wait_timeout=5, poll_interval=0.01, distributed=True)
+        cache.add("key:single-flight", 1)  # 다른 프로세스가 계산 중
+        timer = threading.Timer(0.05, lambda: cache.set("key", {"answer": "remote"}))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        compute = MagicMock(return_value={"answer": "local"})
+
+        result = flight.do("key", compute, lambda: cache.get("key"))
+
+        self.assertEqual(result, {"answer": "remote"})
+        compute.assert_not_called()
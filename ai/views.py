@@ -1,8 +1,16 @@
+import json
 import logging
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ImproperlyConfigured
-from rest_framework import serializers, status
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, serializers, status
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
@@ -12,6 +20,7 @@ from SkillBridge.authentication import CsrfExemptSessionAuthentication
 from certificates.models import Certificate, Tag
 from certificates.serializers import CertificateSerializer, TagSerializer
 from .models import JobTagContribution, SupportInquiry
+from .response_cache import UpstreamUnavailableError
 from .serializers import (
     ChatRequestSerializer,
     JobOcrRequestSerializer,
@@ -31,16 +40,117 @@ def _unauthenticated_response():
     )
 
 
-class ChatView(APIView):
+def _chat_fallback_response(history, user_message):
+    fallback_reply = "죄송하지만 지금은 상담을 이용할 수 없어요. 잠시 후 다시 시도해주세요."
+    conversation = history + [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": fallback_reply},
+    ]
+    metadata = {
+        "intent": "error",
+        "needs_admin": False,
+        "admin_summary": "",
+        "out_of_scope": False,
+        "confidence": 0.0,
+        "error": "unavailable",
+    }
+    return {"reply": fallback_reply, "history": conversation, "metadata": metadata}
+
+
+def _chat_reply_payload(history, user_message, result):
+    reply = result.get("assistant_message") or "죄송하지만 답변을 생성하지 못했습니다."
+    intent = result.get("intent") or "general_question"
+    needs_admin = bool(result.get("needs_admin"))
+    admin_summary = (result.get("admin_summary") or "").strip()
+    out_of_scope = bool(result.get("out_of_scope"))
+    confidence = result.get("confidence") or 0.0
+    context_hits = result.get("context_hits") or []
+
+    if out_of_scope:
+        reply = "죄송하지만, 자격증 및 커리어와 직접 관련된 질문에 대해서만 도와드릴 수 있어요."
+        needs_admin = False
+        admin_summary = ""
+        intent = "out_of_scope"
+
+    conversation = history + [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": reply},
+    ]
+
+    metadata = {
+        "intent": intent,
+        "needs_admin": needs_admin,
+        "admin_summary": admin_summary,
+        "out_of_scope": out_of_scope,
+        "confidence": confidence,
+    }
+    if context_hits:
+        metadata["context_hits"] = context_hits
+
+    return {"reply": reply, "history": conversation, "metadata": metadata}
+
+
+def _sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+class ChatView(View):
+    """Async chat endpoint.
+
+    DRF views are synchronous, so this is a plain Django async view that
+    reuses DRF's authenticators, parsers, serializer and JSON rendering. Under
+    ASGI the LLM call is awaited instead of holding a worker thread; under WSGI
+    every request gets a throwaway event loop, so the service's sync methods
+    are used there to keep sharing the process-wide HTTP client.
+
+    With ``"stream": true`` (or ``Accept: text/event-stream``) the reply is sent
+    as server-sent events: ``token`` events carry ``{"delta": ...}`` pieces of
+    the assistant message, and a final ``done`` event carries the same payload
+    as the JSON response. Its ``reply`` is authoritative, e.g. for out-of-scope
+    answers. Under WSGI (``runserver``, gunicorn sync workers) Django would
+    buffer an async iterator until it finishes, so the stream is produced by a
+    sync generator there; only ASGI streams without holding a worker thread.
+    """
+
     serializer_class = ChatRequestSerializer
     authentication_classes = [CsrfExemptSessionAuthentication, JWTAuthentication]
-
-    def post(self, request):
-        if not getattr(request.user, "is_authenticated", False):
-            return _unauthenticated_response()
-        serializer = self.serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # 세션 인증의 CSRF 검사는 APIView 와 동일하게 인증 클래스에 맡긴다.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def _render(response: Response) -> Response:
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = JSONRenderer.media_type
+        response.renderer_context = {}
+        return response
+
+    def _prepare(self, request):
+        drf_request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[authenticator() for authenticator in self.authentication_classes],
+        )
+        user = drf_request.user
+        if not getattr(user, "is_authenticated", False):
+            return None
+        serializer = self.serializer_class(data=drf_request.data)
+        if not serializer.is_valid():
+            raise exceptions.ValidationError(serializer.errors)
+        return serializer.validated_data
+
+    async def post(self, request):
+        try:
+            # 세션/JWT 사용자 조회는 DB 를 사용하므로 동기 스레드에서 처리한다.
+            data = await sync_to_async(self._prepare)(request)
+        except exceptions.APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            return self._render(Response(detail, status=exc.status_code))
+        if data is None:
+            return self._render(_unauthenticated_response())
 
         history = [
             {"role": item["role"], "content": item["content"]}
@@ -48,69 +158,86 @@ class ChatView(APIView):
             if isinstance(item, dict) and item.get("role") and item.get("content")
         ]
         user_message = data["message"]
+        temperature = data.get("temperature", 0.3)
+
+        if data.get("stream") or "text/event-stream" in request.headers.get("Accept", ""):
+            if isinstance(request, ASGIRequest):
+                events = self._stream_events(history, user_message, temperature)
+            else:
+                events = self._stream_events_sync(history, user_message, temperature)
+            response = StreamingHttpResponse(events, content_type="text/event-stream; charset=utf-8")
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"  # nginx 프록시 버퍼링 비활성화
+            return response
 
         try:
-            service = LangChainChatService()
-            result = service.run(
-                message=user_message,
-                history=history,
-                temperature=data.get("temperature", 0.3),
-            )
+            service = await sync_to_async(LangChainChatService)()
+            if isinstance(request, ASGIRequest):
+                result = await service.arun(
+                    message=user_message,
+                    history=history,
+                    temperature=temperature,
+                )
+            else:
+                # WSGI 에서는 요청마다 새 이벤트 루프가 생겨 비동기 HTTP 클라이언트를 재사용할 수 없으므로,
+                # 요청 스레드에서 공유 동기 클라이언트로 호출한다.
+                result = await sync_to_async(service.run)(
+                    message=user_message,
+                    history=history,
+                    temperature=temperature,
+                )
         except ImproperlyConfigured as exc:
-            return Response({"detail": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return self._render(Response({"detail": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR))
+        except UpstreamUnavailableError:
+            # 직전 실패가 부정 캐시에 남아 있으면 LLM 을 다시 호출하지 않고 바로 안내한다.
+            return self._render(Response(_chat_fallback_response(history, user_message), status=status.HTTP_200_OK))
         except Exception as exc:  # pragma: no cover - defensive
             logger.exception("AI 챗봇 응답 생성 실패: %s", exc)
-            fallback_reply = "죄송하지만 지금은 상담을 이용할 수 없어요. 잠시 후 다시 시도해주세요."
-            conversation = history + [
-                {"role": "user", "content": user_message},
-                {"role": "assistant", "content": fallback_reply},
-            ]
-            metadata = {
-                "intent": "error",
-                "needs_admin": False,
-                "admin_summary": "",
-                "out_of_scope": False,
-                "confidence": 0.0,
-                "error": "unavailable",
-            }
-            return Response(
-                {"reply": fallback_reply, "history": conversation, "metadata": metadata},
-                status=status.HTTP_200_OK,
-            )
+            return self._render(Response(_chat_fallback_response(history, user_message), status=status.HTTP_200_OK))
 
-        reply = result.get("assistant_message") or "죄송하지만 답변을 생성하지 못했습니다."
-        intent = result.get("intent") or "general_question"
-        needs_admin = bool(result.get("needs_admin"))
-        admin_summary = (result.get("admin_summary") or "").strip()
-        out_of_scope = bool(result.get("out_of_scope"))
-        confidence = result.get("confidence") or 0.0
-        context_hits = result.get("context_hits") or []
-
-        if out_of_scope:
-            reply = "죄송하지만, 자격증 및 커리어와 직접 관련된 질문에 대해서만 도와드릴 수 있어요."
-            needs_admin = False
-            admin_summary = ""
-            intent = "out_of_scope"
-
-        conversation = history + [
-            {"role": "user", "content": user_message},
-            {"role": "assistant", "content": reply},
-        ]
+        return self._render(
+            Response(_chat_reply_payload(history, user_message, result), status=status.HTTP_200_OK)
+        )
 
-        metadata = {
-            "intent": intent,
-            "needs_admin": needs_admin,
-            "admin_summary": admin_summary,
-            "out_of_scope": out_of_scope,
-            "confidence": confidence,
-        }
-        if context_hits:
-            metadata["context_hits"] = context_hits
+    async def _stream_events(self, history, user_message, temperature):
+        try:
+            service = await sync_to_async(LangChainChatService)()
+            async for kind, value in service.astream(
+                message=user_message,
+                history=history,
+                temperature=temperature,
+            ):
+                if kind == "token":
+                    yield _sse_event("token", {"delta": value})
+                else:
+                    yield _sse_event("done", _chat_reply_payload(history, user_message, value))
+        except ImproperlyConfigured as exc:
+            yield _sse_event("error", {"detail": str(exc)})
+        except UpstreamUnavailableError:
+            yield _sse_event("done", _chat_fallback_response(history, user_message))
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception("AI 챗봇 스트리밍 응답 생성 실패: %s", exc)
+            yield _sse_event("done", _chat_fallback_response(history, user_message))
 
-        return Response(
-            {"reply": reply, "history": conversation, "metadata": metadata},
-            status=status.HTTP_200_OK,
-        )
+    def _stream_events_sync(self, history, user_message, temperature):
+        try:
+            service = LangChainChatService()
+            for kind, value in service.stream(
+                message=user_message,
+                history=history,
+                temperature=temperature,
+            ):
+                if kind == "token":
+                    yield _sse_event("token", {"delta": value})
+                else:
+                    yield _sse_event("done", _chat_reply_payload(history, user_message, value))
+        except ImproperlyConfigured as exc:
+            yield _sse_event("error", {"detail": str(exc)})
+        except UpstreamUnavailableError:
+            yield _sse_event("done", _chat_fallback_response(history, user_message))
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception("AI 챗봇 스트리밍 응답 생성 실패: %s", exc)
+            yield _sse_event("done", _chat_fallback_response(history, user_message))
 
 
 class JobCertificateRecommendationView(APIView):
@@ -24,13 +24,13 @@ done
 if [ "${RAG_AUTO_BUILD:-false}" = "true" ]; then
   RAG_SOURCE_PATH=${RAG_SOURCE_PATH:-data/data.xlsx}
   RAG_DOCUMENTS_PATH=${RAG_DOCUMENTS_PATH:-data/rag/documents.jsonl}
-  RAG_INDEX_PATH=${RAG_INDEX_PATH:-data/rag/index.json}
+  RAG_INDEX_PATH=${RAG_INDEX_PATH:-data/rag/index.npy}
 
   if [ -f "$RAG_SOURCE_PATH" ]; then
     echo "Building RAG documents from ${RAG_SOURCE_PATH} ..."
     python scripts/build_rag_documents.py --input "$RAG_SOURCE_PATH" --output "$RAG_DOCUMENTS_PATH"
 
-    if [ -n "${GPT_KEY:-}" ] || [ -n "${OPENAI_API_KEY:-}" ]; then
+    if [ "${RAG_EMBEDDING_BACKEND:-openai}" = "local" ] || [ -n "${GPT_KEY:-}" ] || [ -n "${OPENAI_API_KEY:-}" ]; then
       echo "Building RAG index at ${RAG_INDEX_PATH} ..."
       python scripts/build_rag_index.py --input "$RAG_DOCUMENTS_PATH" --output "$RAG_INDEX_PATH"
     else
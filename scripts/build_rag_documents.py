@@ -6,28 +6,35 @@ Example usage:
     python scripts/build_rag_documents.py \
         --input data/data.xlsx \
         --output data/rag/documents.jsonl
+
+The workbook is read in openpyxl read-only mode and parsed rows are staged in
+a temporary SQLite file, so documents are written one at a time and memory use
+does not grow with the number of statistics rows.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
+import sqlite3
+import tempfile
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from openpyxl import load_workbook
 
 
-@dataclass
+@dataclass(slots=True)
 class RatingInfo:
     score: str
     description: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class CertificateInfo:
     cert_id: str
     name: str
@@ -43,7 +50,7 @@ class CertificateInfo:
     homepage: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class StatisticEntry:
     cert_id: str
     stat_id: Optional[str]
@@ -57,14 +64,14 @@ class StatisticEntry:
     pass_rate: Optional[float]
 
 
-def load_table_rows(worksheet) -> List[Dict[str, Any]]:
-    headers: List[str] = []
-    for cell in worksheet[1]:
-        value = cell.value
-        headers.append("" if value is None else str(value).strip())
+def iter_table_rows(worksheet) -> Iterator[Dict[str, Any]]:
+    raw_rows = worksheet.iter_rows(values_only=True)
+    header_row = next(raw_rows, None)
+    if header_row is None:
+        return
+    headers = ["" if value is None else str(value).strip() for value in header_row]
 
-    rows: List[Dict[str, Any]] = []
-    for raw in worksheet.iter_rows(min_row=2, values_only=True):
+    for raw in raw_rows:
         if not any(value not in (None, "") for value in raw):
             continue
         row: Dict[str, Any] = {}
@@ -72,8 +79,7 @@ def load_table_rows(worksheet) -> List[Dict[str, Any]]:
             if not header:
                 continue
             row[header] = raw[index] if index < len(raw) else None
-        rows.append(row)
-    return rows
+        yield row
 
 
 def to_int(value: Any) -> Optional[int]:
@@ -181,76 +187,68 @@ def build_rating_map(rows: Iterable[Dict[str, Any]]) -> Dict[str, RatingInfo]:
     return mapping
 
 
-def build_certificate_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, CertificateInfo]:
-    certificates: Dict[str, CertificateInfo] = {}
-    for row in rows:
-        cert_id = normalize_text(row.get("id"))
-        name = normalize_text(row.get("name"))
-        if not cert_id or not name:
-            continue
-        certificates[cert_id] = CertificateInfo(
-            cert_id=cert_id,
-            name=name,
-            overview=normalize_text(row.get("overview")),
-            job_roles=normalize_text(row.get("job_roles")),
-            exam_method=normalize_text(row.get("exam_method")),
-            eligibility=normalize_text(row.get("eligibility")),
-            rating=normalize_text(row.get("rating")),
-            expected_duration=normalize_text(row.get("expected_duration")),
-            expected_duration_major=normalize_text(row.get("expected_duration_major")),
-            authority=normalize_text(row.get("authority")),
-            cert_type=normalize_text(row.get("type")),
-            homepage=normalize_text(row.get("homepage")),
-        )
-    return certificates
+def parse_certificate(row: Dict[str, Any]) -> Optional[CertificateInfo]:
+    cert_id = normalize_text(row.get("id"))
+    name = normalize_text(row.get("name"))
+    if not cert_id or not name:
+        return None
+    return CertificateInfo(
+        cert_id=cert_id,
+        name=name,
+        overview=normalize_text(row.get("overview")),
+        job_roles=normalize_text(row.get("job_roles")),
+        exam_method=normalize_text(row.get("exam_method")),
+        eligibility=normalize_text(row.get("eligibility")),
+        rating=normalize_text(row.get("rating")),
+        expected_duration=normalize_text(row.get("expected_duration")),
+        expected_duration_major=normalize_text(row.get("expected_duration_major")),
+        authority=normalize_text(row.get("authority")),
+        cert_type=normalize_text(row.get("type")),
+        homepage=normalize_text(row.get("homepage")),
+    )
 
 
-def build_statistics(rows: Iterable[Dict[str, Any]]) -> List[StatisticEntry]:
-    stats: List[StatisticEntry] = []
-    for row in rows:
-        cert_id = normalize_text(row.get("cert_id")) or normalize_text(row.get("certificate_id"))
-        if not cert_id:
-            continue
-        exam_type = normalize_text(row.get("exam_type"))
-        stage = normalize_stage(exam_type)
-        year = normalize_text(row.get("year"))
-        session = normalize_text(row.get("session"))
-        registered = to_int(row.get("registered") or row.get("registerd"))
-        applicants = to_int(row.get("applicants"))
-        passers = to_int(row.get("passers"))
-        pass_rate = to_float(row.get("pass_rate"))
-
-        base_total = applicants if applicants not in (None, 0) else registered
-        calculated_rate: Optional[float] = None
-        if passers not in (None, 0) and base_total not in (None, 0):
-            try:
-                calculated_rate = round(passers / base_total * 100, 1)
-            except ZeroDivisionError:
-                calculated_rate = None
-
-        if pass_rate is None:
+def parse_statistic(row: Dict[str, Any]) -> Optional[StatisticEntry]:
+    cert_id = normalize_text(row.get("cert_id")) or normalize_text(row.get("certificate_id"))
+    if not cert_id:
+        return None
+    exam_type = normalize_text(row.get("exam_type"))
+    stage = normalize_stage(exam_type)
+    year = normalize_text(row.get("year"))
+    session = normalize_text(row.get("session"))
+    registered = to_int(row.get("registered") or row.get("registerd"))
+    applicants = to_int(row.get("applicants"))
+    passers = to_int(row.get("passers"))
+    pass_rate = to_float(row.get("pass_rate"))
+
+    base_total = applicants if applicants not in (None, 0) else registered
+    calculated_rate: Optional[float] = None
+    if passers not in (None, 0) and base_total not in (None, 0):
+        try:
+            calculated_rate = round(passers / base_total * 100, 1)
+        except ZeroDivisionError:
+            calculated_rate = None
+
+    if pass_rate is None:
+        pass_rate = calculated_rate
+    else:
+        pass_rate = round(pass_rate, 1)
+        if pass_rate <= 1 and calculated_rate and calculated_rate > 1:
+            # 워크북에 0~1 범위 비율로 저장된 값 보정
             pass_rate = calculated_rate
-        else:
-            pass_rate = round(pass_rate, 1)
-            if pass_rate <= 1 and calculated_rate and calculated_rate > 1:
-                # 워크북에 0~1 범위 비율로 저장된 값 보정
-                pass_rate = calculated_rate
-
-        stats.append(
-            StatisticEntry(
-                cert_id=cert_id,
-                stat_id=normalize_text(row.get("id")),
-                exam_type=exam_type,
-                stage=stage,
-                year=year,
-                session=session,
-                registered=registered,
-                applicants=applicants,
-                passers=passers,
-                pass_rate=pass_rate,
-            )
-        )
-    return stats
+
+    return StatisticEntry(
+        cert_id=cert_id,
+        stat_id=normalize_text(row.get("id")),
+        exam_type=exam_type,
+        stage=stage,
+        year=year,
+        session=session,
+        registered=registered,
+        applicants=applicants,
+        passers=passers,
+        pass_rate=pass_rate,
+    )
 
 
 def build_profile_document(cert: CertificateInfo, rating_map: Dict[str, RatingInfo]) -> Dict[str, Any]:
@@ -367,26 +365,100 @@ def build_statistics_documents(
     return documents
 
 
-def generate_documents(input_path: Path) -> List[Dict[str, Any]]:
-    workbook = load_workbook(input_path, data_only=True)
-    rating_rows = load_table_rows(workbook["rating"])
-    certificate_rows = load_table_rows(workbook["certificate"])
-    stats_rows = load_table_rows(workbook["certificate_statistics"])
+class _StagingStore:
+    """Temporary on-disk store that groups parsed rows by certificate.
 
-    rating_map = build_rating_map(rating_rows)
-    certificates = build_certificate_rows(certificate_rows)
-    stats_entries = build_statistics(stats_rows)
+    Certificates keep the first-seen order with last-row-wins values, matching
+    a dict keyed by ``cert_id``; statistics keep their workbook order.
+    """
 
-    stats_by_cert: Dict[str, List[StatisticEntry]] = defaultdict(list)
-    for entry in stats_entries:
-        stats_by_cert[entry.cert_id].append(entry)
+    def __init__(self, directory: str):
+        self._conn = sqlite3.connect(str(Path(directory) / "staging.sqlite3"))
+        self._conn.execute("CREATE TABLE certificate (cert_id TEXT PRIMARY KEY, fields TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE statistic (cert_id TEXT NOT NULL, fields TEXT NOT NULL)")
 
-    documents: List[Dict[str, Any]] = []
-    for cert in certificates.values():
-        documents.append(build_profile_document(cert, rating_map))
-        stat_docs = build_statistics_documents(cert, stats_by_cert.get(cert.cert_id, []))
-        documents.extend(stat_docs)
-    return documents
+    def add_certificates(self, certificates: Iterable[CertificateInfo]) -> None:
+        self._conn.executemany(
+            "INSERT INTO certificate (cert_id, fields) VALUES (?, ?) "
+            "ON CONFLICT(cert_id) DO UPDATE SET fields = excluded.fields",
+            ((cert.cert_id, json.dumps(astuple(cert), ensure_ascii=False)) for cert in certificates),
+        )
+
+    def add_statistics(self, entries: Iterable[StatisticEntry]) -> None:
+        self._conn.executemany(
+            "INSERT INTO statistic (cert_id, fields) VALUES (?, ?)",
+            ((entry.cert_id, json.dumps(astuple(entry), ensure_ascii=False)) for entry in entries),
+        )
+        self._conn.execute("CREATE INDEX statistic_cert ON statistic (cert_id)")
+
+    def iter_certificates(self) -> Iterator[CertificateInfo]:
+        cursor = self._conn.execute("SELECT fields FROM certificate ORDER BY rowid")
+        for (fields,) in cursor:
+            yield CertificateInfo(*json.loads(fields))
+
+    def statistics_for(self, cert_id: str) -> List[StatisticEntry]:
+        cursor = self._conn.execute("SELECT fields FROM statistic WHERE cert_id = ? ORDER BY rowid", (cert_id,))
+        return [StatisticEntry(*json.loads(fields)) for (fields,) in cursor]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def iter_documents(input_path: Path) -> Iterator[Dict[str, Any]]:
+    workbook = load_workbook(input_path, read_only=True, data_only=True)
+    try:
+        with tempfile.TemporaryDirectory(prefix="rag-documents-") as directory:
+            store = _StagingStore(directory)
+            try:
+                # 난이도 표는 자격증 문서마다 참조되므로 메모리에 유지한다.
+                rating_map = build_rating_map(iter_table_rows(workbook["rating"]))
+                store.add_certificates(
+                    cert
+                    for cert in map(parse_certificate, iter_table_rows(workbook["certificate"]))
+                    if cert is not None
+                )
+                store.add_statistics(
+                    entry
+                    for entry in map(parse_statistic, iter_table_rows(workbook["certificate_statistics"]))
+                    if entry is not None
+                )
+
+                for cert in store.iter_certificates():
+                    yield build_profile_document(cert, rating_map)
+                    yield from build_statistics_documents(cert, store.statistics_for(cert.cert_id))
+            finally:
+                store.close()
+    finally:
+        workbook.close()
+
+
+def generate_documents(input_path: Path) -> List[Dict[str, Any]]:
+    return list(iter_documents(input_path))
+
+
+def write_documents(documents: Iterable[Dict[str, Any]], output: Path) -> int:
+    """Stream ``documents`` to ``output`` as JSONL, replacing it only once every document was written."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    # 중간에 파싱이 실패해도 잘린 documents.jsonl 이 남지 않도록 임시 파일에 쓴 뒤 교체한다.
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=output.parent, prefix=f".{output.name}.", suffix=".tmp", delete=False
+    ) as fp:
+        tmp_name = fp.name
+        try:
+            for doc in documents:
+                fp.write(json.dumps(doc, ensure_ascii=False))
+                fp.write("\n")
+                count += 1
+        except BaseException:
+            fp.close()
+            os.unlink(tmp_name)
+            raise
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp_name, 0o666 & ~umask)
+    os.replace(tmp_name, output)
+    return count
 
 
 def main() -> None:
@@ -403,15 +475,8 @@ def main() -> None:
     if not args.input.exists():
         raise SystemExit(f"Input file not found: {args.input}")
 
-    documents = generate_documents(args.input)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-
-    with args.output.open("w", encoding="utf-8") as fp:
-        for doc in documents:
-            fp.write(json.dumps(doc, ensure_ascii=False))
-            fp.write("\n")
-
-    print(f"Generated {len(documents)} documents at {args.output}")
+    count = write_documents(iter_documents(args.input), args.output)
+    print(f"Generated {count} documents at {args.output}")
 
 
 if __name__ == "__main__":
@@ -5,21 +5,64 @@ Generate a vector index for RAG from the pre-built documents JSONL.
 Example:
     python scripts/build_rag_index.py \
         --input data/rag/documents.jsonl \
-        --output data/rag/index.json \
+        --output data/rag/index.npy \
         --model text-embedding-3-small
+
+The default output is a float32 ``.npy`` matrix with a ``.meta.json`` sidecar
+that the retriever memory-maps. Pass an ``--output`` ending in ``.json`` to
+write the legacy single-file JSON index instead.
+
+Documents are embedded incrementally: each document's text is hashed and
+vectors from the existing index at ``--output`` are reused for unchanged
+hashes, so only new or edited documents hit the embedding API. Use
+``--full`` to re-embed everything.
+
+Pending documents are grouped into token-bounded batches (counted with
+tiktoken) and embedded by a thread pool of ``--concurrency`` workers with
+retry/backoff (only for rate limits, connection errors and 5xx responses).
+Finished batches are appended to ``<output>.checkpoint.jsonl`` as they
+complete, so an interrupted or failed run resumes where it stopped.
+
+``--backend local`` skips the API entirely: a hashed character n-gram TF-IDF
+embedder is fitted on the documents and saved next to the index
+(``.embedder.npz``) so the server embeds queries with the same weights.
+
+Add ``--ivf`` to also build an inverted-file ANN index (``.ivf.npz``) and
+report its recall@k against exact search. The retriever uses it when
+``RAG_SEARCH_ENGINE=ivf``.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
+import numpy as np
+import openai
 from langchain_openai import OpenAIEmbeddings
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai.rag import (  # noqa: E402
+    HashingNgramEmbedder,
+    IvfIndex,
+    RagRetrieverError,
+    embedder_sidecar_path,
+    ivf_sidecar_path,
+    normalize_rows,
+    read_index,
+    save_binary_index,
+)
+
 
 def _load_documents(path: Path) -> List[Dict[str, Any]]:
     documents: List[Dict[str, Any]] = []
@@ -43,6 +86,327 @@ def _resolve_api_key(provided: str | None = None) -> str:
     return api_key
 
 
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load_previous_vectors(path: Path, model: str) -> Tuple[Dict[str, np.ndarray], Dict[str, str]]:
+    """Return ``(hash -> vector, document id -> hash)`` from an existing index built with ``model``."""
+    if not path.exists() and path.suffix == ".npy":
+        # 바이너리 인덱스를 처음 만들 때는 옆에 있는 기존 JSON 인덱스의 임베딩을 재사용한다.
+        path = path.with_suffix(".json")
+    if not path.exists():
+        return {}, {}
+    try:
+        documents, matrix, previous_model = read_index(path)
+    except RagRetrieverError as exc:
+        print(f"기존 인덱스를 읽지 못해 전체 임베딩을 수행합니다: {exc}")
+        return {}, {}
+    if previous_model and previous_model != model:
+        print(f"임베딩 모델이 변경되어({previous_model} -> {model}) 전체 임베딩을 수행합니다.")
+        return {}, {}
+
+    vectors: Dict[str, np.ndarray] = {}
+    hashes_by_id: Dict[str, str] = {}
+    for doc, vector in zip(documents, matrix):
+        digest = _content_hash(doc.get("text") or "")
+        vectors[digest] = np.array(vector, dtype=np.float32)
+        if doc.get("id") is not None:
+            hashes_by_id[str(doc["id"])] = digest
+    return vectors, hashes_by_id
+
+
+def _token_counter(model: str) -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:  # tiktoken 인코딩 파일을 내려받지 못한 오프라인 환경 등
+        print(f"tiktoken을 사용할 수 없어 글자 수로 토큰 수를 추정합니다: {exc}")
+        return len
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _plan_batches(
+    items: Sequence[Tuple[str, str]],
+    *,
+    max_items: int,
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> List[List[Tuple[str, str]]]:
+    """Group ``(key, text)`` items so each request stays under both item and token limits."""
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    current_tokens = 0
+    for key, text in items:
+        tokens = count_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((key, text))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class _RateLimiter:
+    """Spaces request starts so that at most ``per_minute`` requests begin each minute."""
+
+    def __init__(self, per_minute: int):
+        self._interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self._interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Rate limits, connection problems and server errors are transient; other errors are not."""
+    status_code = getattr(exc, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    return isinstance(exc, (openai.APIConnectionError, ConnectionError, TimeoutError))
+
+
+def _embed_with_retry(
+    embedder,
+    texts: List[str],
+    *,
+    limiter: _RateLimiter,
+    max_retries: int,
+    base_delay: float,
+) -> List[List[float]]:
+    attempt = 0
+    while True:
+        limiter.wait()
+        try:
+            vectors = embedder.embed_documents(texts)
+        except Exception as exc:  # openai.RateLimitError, 네트워크 오류 등
+            attempt += 1
+            if attempt > max_retries or not _is_retryable(exc):
+                raise
+            delay = base_delay * (2 ** (attempt - 1)) * (1 + random.random())
+            print(f"임베딩 요청 실패({exc}); {delay:.1f}초 후 재시도 {attempt}/{max_retries}")
+            time.sleep(delay)
+            continue
+        if len(vectors) != len(texts):
+            raise RuntimeError("임베딩 결과 수가 요청한 문서 수와 일치하지 않습니다.")
+        return vectors
+
+
+def _checkpoint_path(output: Path) -> Path:
+    return output.with_name(f"{output.name}.checkpoint.jsonl")
+
+
+def _load_checkpoint(path: Path, model: str) -> Dict[str, np.ndarray]:
+    if not path.exists():
+        return {}
+    vectors: Dict[str, np.ndarray] = {}
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단 시점에 잘린 마지막 줄
+            if entry.get("model") != model:
+                continue
+            vectors[entry["hash"]] = np.asarray(entry["embedding"], dtype=np.float32)
+    return vectors
+
+
+def embed_concurrently(
+    embedder,
+    items: Sequence[Tuple[str, str]],
+    *,
+    model: str,
+    checkpoint: Path,
+    concurrency: int = 4,
+    max_items: int = 64,
+    max_tokens: int = 100_000,
+    requests_per_minute: int = 0,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    count_tokens: Callable[[str], int] = len,
+) -> Dict[str, np.ndarray]:
+    """Embed ``(key, text)`` items in parallel batches and return ``key -> vector``.
+
+    Any object with ``embed_documents(texts)`` works as ``embedder``, so the
+    pipeline can be exercised with a local fake. Completed batches are
+    appended to ``checkpoint`` and skipped when the run is repeated. On the
+    first failed batch, queued batches are cancelled, the ones already running
+    are still checkpointed, and the error is re-raised.
+    """
+    results = _load_checkpoint(checkpoint, model)
+    remaining = [(key, text) for key, text in items if key not in results]
+    if results:
+        print(f"체크포인트에서 {len(results)}개 임베딩을 복구했습니다.")
+    if not remaining:
+        return results
+
+    batches = _plan_batches(remaining, max_items=max_items, max_tokens=max_tokens, count_tokens=count_tokens)
+    limiter = _RateLimiter(requests_per_minute)
+    write_lock = threading.Lock()
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+
+    def run(batch: List[Tuple[str, str]]) -> List[Tuple[str, np.ndarray]]:
+        vectors = _embed_with_retry(
+            embedder,
+            [text for _, text in batch],
+            limiter=limiter,
+            max_retries=max_retries,
+            base_delay=base_delay,
+        )
+        return [(key, np.asarray(vector, dtype=np.float32)) for (key, _), vector in zip(batch, vectors)]
+
+    done = 0
+    failure: Exception | None = None
+    with checkpoint.open("a", encoding="utf-8") as handle, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(run, batch) for batch in batches]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                embedded = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                if failure is None:
+                    failure = exc
+                    # 대기 중인 배치는 취소하고, 이미 요청 중인 배치는 끝나는 대로 체크포인트에 남긴다.
+                    # (shutdown(cancel_futures=True) 는 as_completed 에 취소를 알리지 않아 멈춘다.)
+                    for pending in futures:
+                        pending.cancel()
+                continue
+            with write_lock:
+                for key, vector in embedded:
+                    results[key] = vector
+                    handle.write(json.dumps({"model": model, "hash": key, "embedding": vector.tolist()}))
+                    handle.write("\n")
+                handle.flush()
+            done += 1
+            print(f"임베딩 배치 {done}/{len(batches)} 완료")
+    if failure is not None:
+        raise failure
+    return results
+
+
+def _write_json_index(path: Path, docs: List[Dict[str, Any]], vectors: List[np.ndarray], model: str) -> None:
+    index_payload = {
+        "model": model,
+        "document_count": len(docs),
+        "documents": [],
+    }
+
+    for doc, vector in zip(docs, vectors):
+        record = dict(doc)
+        record["embedding"] = np.asarray(vector, dtype=np.float32).tolist()
+        index_payload["documents"].append(record)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(index_payload, handle, ensure_ascii=False)
+
+
+def _ivf_recall_at_k(
+    matrix: np.ndarray,
+    ivf: IvfIndex,
+    *,
+    n_probe: int,
+    top_k: int,
+    sample_size: int,
+    seed: int = 0,
+) -> float:
+    """Measure recall@k of IVF search against exact search, using sampled documents as queries.
+
+    Each sampled document is left out of its own results: it always sits in a
+    probed list, so counting it as a hit would inflate the estimate.
+    """
+    data = normalize_rows(matrix)
+    top_k = min(top_k, data.shape[0] - 1)
+    if top_k < 1:
+        return 1.0
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(data.shape[0], size=min(sample_size, data.shape[0]), replace=False)
+    queries = data[sample]
+
+    exact_scores = queries @ data.T
+    exact_scores[np.arange(len(sample)), sample] = -np.inf
+    exact_top = np.argpartition(-exact_scores, top_k - 1, axis=1)[:, :top_k]
+
+    found = 0
+    for row, query, rows, expected in zip(sample, queries, ivf.probe_many(queries, n_probe), exact_top):
+        rows = rows[rows != row]
+        scores = data[rows] @ query
+        keep = min(top_k, rows.size)
+        approx = rows[np.argpartition(-scores, keep - 1)[:keep]] if keep else rows
+        found += len(set(approx.tolist()) & set(expected.tolist()))
+    return found / (len(sample) * top_k)
+
+
+def _save_embedder_state(output: Path, embedder: HashingNgramEmbedder | None) -> None:
+    sidecar = embedder_sidecar_path(output)
+    if embedder is None:
+        # OpenAI 임베딩으로 다시 빌드하면 이전 로컬 임베딩 설정은 더 이상 쓰이지 않는다.
+        sidecar.unlink(missing_ok=True)
+    else:
+        embedder.save(sidecar)
+
+
+def _embed_with_openai(args: argparse.Namespace, docs: List[Dict[str, Any]]) -> List[np.ndarray]:
+    previous_vectors, previous_hashes = ({}, {}) if args.full else _load_previous_vectors(args.output, args.model)
+    hashes = [_content_hash(doc["text"]) for doc in docs]
+
+    current_ids = {str(doc["id"]): digest for doc, digest in zip(docs, hashes) if doc.get("id") is not None}
+    added = sum(1 for doc_id in current_ids if doc_id not in previous_hashes)
+    changed = sum(
+        1 for doc_id, digest in current_ids.items() if doc_id in previous_hashes and previous_hashes[doc_id] != digest
+    )
+    removed = sum(1 for doc_id in previous_hashes if doc_id not in current_ids)
+
+    pending = list(dict.fromkeys(digest for digest in hashes if digest not in previous_vectors))
+    reused = sum(1 for digest in hashes if digest in previous_vectors)
+    print(
+        f"문서 {len(docs)}개: 추가 {added}, 변경 {changed}, 삭제 {removed}, "
+        f"재사용 {reused}, 임베딩 대상 {len(pending)}"
+    )
+
+    fresh_vectors: Dict[str, np.ndarray] = {}
+    checkpoint = _checkpoint_path(args.output)
+    if pending:
+        api_key = _resolve_api_key(args.api_key)
+        # 재시도는 embed_concurrently 에서 백오프와 함께 처리한다.
+        embeddings = OpenAIEmbeddings(api_key=api_key, model=args.model, max_retries=0)
+        text_by_hash = {digest: doc["text"] for doc, digest in zip(docs, hashes)}
+
+        try:
+            fresh_vectors = embed_concurrently(
+                embeddings,
+                [(digest, text_by_hash[digest]) for digest in pending],
+                model=args.model,
+                checkpoint=checkpoint,
+                concurrency=args.concurrency,
+                max_items=max(1, args.batch_size),
+                max_tokens=max(1, args.max_batch_tokens),
+                requests_per_minute=args.requests_per_minute,
+                max_retries=args.max_retries,
+                count_tokens=_token_counter(args.model),
+            )
+        except Exception as exc:
+            raise SystemExit(f"임베딩 생성에 실패했습니다 (완료된 배치는 {checkpoint}에 보존됨): {exc}") from exc
+
+    return [fresh_vectors.get(digest, previous_vectors.get(digest)) for digest in hashes]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build SkillBridge RAG index.")
     parser.add_argument(
@@ -54,8 +418,20 @@ def main() -> None:
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path("data/rag/index.json"),
-        help="생성할 인덱스 파일 경로",
+        default=Path("data/rag/index.npy"),
+        help="생성할 인덱스 파일 경로 (.npy: 바이너리, .json: 레거시 JSON)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("openai", "local"),
+        default=os.getenv("RAG_EMBEDDING_BACKEND", "openai"),
+        help="임베딩 백엔드 (local: 네트워크 없이 문자 n-gram TF-IDF 해싱 임베딩)",
+    )
+    parser.add_argument(
+        "--local-dimension",
+        type=int,
+        default=1024,
+        help="local 백엔드의 임베딩 차원 수",
     )
     parser.add_argument(
         "--model",
@@ -72,7 +448,65 @@ def main() -> None:
         "--batch-size",
         type=int,
         default=64,
-        help="임베딩 요청 배치 크기",
+        help="임베딩 요청 한 번에 보낼 최대 문서 수",
+    )
+    parser.add_argument(
+        "--max-batch-tokens",
+        type=int,
+        default=100_000,
+        help="임베딩 요청 한 번에 보낼 최대 토큰 수 (tiktoken 기준)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="동시에 보낼 임베딩 요청 수",
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        default=0,
+        help="분당 최대 임베딩 요청 수 (0이면 제한 없음)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="임베딩 요청 실패 시 재시도 횟수 (지수 백오프)",
+    )
+    parser.add_argument(
+        "--ivf",
+        action="store_true",
+        help="근사 최근접 검색용 IVF 인덱스(.ivf.npz)를 함께 생성",
+    )
+    parser.add_argument(
+        "--ivf-lists",
+        type=int,
+        default=0,
+        help="IVF 리스트(클러스터) 수 (0이면 문서 수의 제곱근)",
+    )
+    parser.add_argument(
+        "--ivf-nprobe",
+        type=int,
+        default=int(os.getenv("RAG_IVF_NPROBE", "8")),
+        help="recall 측정 시 탐색할 IVF 리스트 수",
+    )
+    parser.add_argument(
+        "--eval-top-k",
+        type=int,
+        default=4,
+        help="IVF recall@k 측정에 사용할 k",
+    )
+    parser.add_argument(
+        "--eval-queries",
+        type=int,
+        default=200,
+        help="IVF recall 측정에 사용할 표본 문서 수",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="기존 인덱스의 임베딩을 재사용하지 않고 모든 문서를 다시 임베딩",
     )
 
     args = parser.parse_args()
@@ -84,36 +518,52 @@ def main() -> None:
     if not docs:
         raise SystemExit("임베딩할 문서를 찾지 못했습니다.")
 
-    api_key = _resolve_api_key(args.api_key)
-    embeddings = OpenAIEmbeddings(api_key=api_key, model=args.model)
-
-    texts = [doc["text"] for doc in docs]
-    vectors: List[List[float]] = []
-    batch = max(1, args.batch_size)
-    for start in range(0, len(texts), batch):
-        chunk = texts[start : start + batch]
-        vectors.extend(embeddings.embed_documents(chunk))
-
-    if len(vectors) != len(docs):
-        raise SystemExit("임베딩 결과 수가 문서 수와 일치하지 않습니다.")
-
-    index_payload = {
-        "model": args.model,
-        "document_count": len(docs),
-        "documents": [],
-    }
-
-    for doc, vector in zip(docs, vectors):
-        record = dict(doc)
-        record["embedding"] = vector
-        index_payload["documents"].append(record)
+    if args.backend == "local":
+        # 로컬 임베딩은 문서 전체로 IDF를 다시 맞추므로 증분 재사용 없이 전부 계산한다.
+        local_embedder = HashingNgramEmbedder.fit(
+            [doc["text"] for doc in docs],
+            dimension=max(1, args.local_dimension),
+        )
+        model_name = local_embedder.model_name
+        vectors = list(local_embedder.embed_documents([doc["text"] for doc in docs]))
+        print(f"문서 {len(docs)}개를 로컬 임베딩({model_name})으로 변환했습니다.")
+    else:
+        local_embedder = None
+        model_name = args.model
+        vectors = _embed_with_openai(args, docs)
 
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as handle:
-        json.dump(index_payload, handle, ensure_ascii=False)
+    checkpoint = _checkpoint_path(args.output)
+    if args.output.suffix == ".json":
+        if args.ivf:
+            raise SystemExit("IVF 인덱스는 바이너리(.npy) 출력에서만 지원합니다.")
+        _write_json_index(args.output, docs, vectors, model_name)
+        _save_embedder_state(args.output, local_embedder)
+        checkpoint.unlink(missing_ok=True)
+        print(f"Saved RAG index with {len(docs)} documents to {args.output}")
+        return
 
+    matrix = np.vstack(vectors)
+    save_binary_index(args.output, documents=docs, embeddings=matrix, model_name=model_name)
+    _save_embedder_state(args.output, local_embedder)
+    checkpoint.unlink(missing_ok=True)
     print(f"Saved RAG index with {len(docs)} documents to {args.output}")
 
+    if args.ivf:
+        n_lists = args.ivf_lists or max(1, int(round(len(docs) ** 0.5)))
+        ivf = IvfIndex.build(matrix, n_lists=n_lists)
+        ivf_path = ivf.save(ivf_sidecar_path(args.output))
+        recall = _ivf_recall_at_k(
+            matrix,
+            ivf,
+            n_probe=args.ivf_nprobe,
+            top_k=args.eval_top_k,
+            sample_size=args.eval_queries,
+        )
+        print(
+            f"Saved IVF index with {ivf.n_lists} lists to {ivf_path} "
+            f"(recall@{args.eval_top_k} with nprobe={args.ivf_nprobe}: {recall:.3f})"
+        )
+
 
 if __name__ == "__main__":
     try: